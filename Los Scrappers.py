@@ -1,8 +1,22 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 from bs4 import BeautifulSoup
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+import argparse
+import hashlib
+import json
+import os
+import queue
+import threading
 import pandas as pd
 import time
+from limpieza import equipos_desde_goleadores, limpiar_goleadores
 
 # ----------------------------
 # Proyecto Final
@@ -14,14 +28,106 @@ años = [2002, 2006, 2010, 2014, 2018, 2022]
 urls = {año: f"https://www.espn.com.mx/futbol/estadisticas/_/liga/FIFA.WORLD/temporada/{año}/vista/anotaciones"
         for año in años}
 
-def extraccion(url, año):
+TITULO_GOLEADORES = (By.XPATH, "//div[contains(@class, 'Table__Title') and normalize-space()='Goleadores']")
+
+def crear_driver():
     options = Options()
     options.add_argument('--headless')
-    driver = webdriver.Chrome(options=options)
-    driver.get(url)
-    time.sleep(5)
-    soup = BeautifulSoup(driver.page_source, 'html.parser')
-    driver.quit()
+    return webdriver.Chrome(options=options)
+
+class PoolDrivers:
+    # Navegadores reutilizables; como máximo `tamaño` Chrome abiertos a la vez
+    def __init__(self, tamaño):
+        self._libres = queue.Queue()
+        for _ in range(tamaño):
+            self._libres.put(None)
+
+    @contextmanager
+    def prestar(self):
+        driver = self._libres.get()
+        try:
+            if driver is None:
+                driver = crear_driver()
+            yield driver
+        except Exception:
+            # Un driver que falló puede quedar en mal estado, se descarta
+            if driver is not None:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+            driver = None
+            raise
+        finally:
+            self._libres.put(driver)
+
+    def cerrar(self):
+        while not self._libres.empty():
+            driver = self._libres.get_nowait()
+            if driver is not None:
+                driver.quit()
+
+def obtener_html(pool, url, reintentos=3, espera=20, backoff=2):
+    for intento in range(1, reintentos + 1):
+        try:
+            with pool.prestar() as driver:
+                driver.get(url)
+                # Las páginas viejas no tienen el título: ahí basta con la tabla (parsear_tabla usa la primera)
+                WebDriverWait(driver, espera).until(EC.any_of(
+                    EC.presence_of_element_located(TITULO_GOLEADORES),
+                    EC.presence_of_element_located((By.TAG_NAME, 'table'))))
+                return driver.page_source
+        except Exception as e:
+            if intento == reintentos:
+                print(f"{url}: falló tras {reintentos} intentos ({type(e).__name__})")
+                return None
+            time.sleep(backoff ** intento)
+
+class CacheHTML:
+    # Páginas guardadas por el hash de su contenido + un índice url -> (hash, fecha)
+    def __init__(self, carpeta='cache_html'):
+        self.carpeta = carpeta
+        self._ruta_indice = os.path.join(carpeta, 'indice.json')
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(carpeta, 'objetos'), exist_ok=True)
+        if os.path.exists(self._ruta_indice):
+            with open(self._ruta_indice, 'r', encoding='utf-8') as f:
+                self._indice = json.load(f)
+        else:
+            self._indice = {}
+
+    def _ruta_objeto(self, digest):
+        return os.path.join(self.carpeta, 'objetos', f"{digest}.html")
+
+    def leer(self, url, vigencia=None):
+        # vigencia=None significa que la copia guardada nunca expira
+        entrada = self._indice.get(url)
+        if entrada is None or not os.path.exists(self._ruta_objeto(entrada['hash'])):
+            return None
+        if vigencia is not None and datetime.now() - datetime.fromisoformat(entrada['fecha']) > vigencia:
+            return None
+        with open(self._ruta_objeto(entrada['hash']), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def guardar(self, url, html):
+        digest = hashlib.sha256(html.encode('utf-8')).hexdigest()
+        ruta = self._ruta_objeto(digest)
+        if not os.path.exists(ruta):
+            with open(ruta, 'w', encoding='utf-8') as f:
+                f.write(html)
+        with self._lock:
+            self._indice[url] = {'hash': digest, 'fecha': datetime.now().isoformat(timespec='seconds')}
+            temporal = self._ruta_indice + '.tmp'
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(self._indice, f, indent=2)
+            os.replace(temporal, self._ruta_indice)
+
+def vigencia_para(año):
+    # Un mundial que ya terminó no cambia; el del año en curso se revisa cada 6 horas
+    return None if año < date.today().year else timedelta(hours=6)
+
+def parsear_tabla(html, año):
+    soup = BeautifulSoup(html, 'html.parser')
     divisor = soup.find('div', class_='Table__Title', string='Goleadores')
     tabla = divisor.find_next('table') if divisor else soup.find('table')
     if not tabla:
@@ -42,27 +148,105 @@ def extraccion(url, año):
     df['Año'] = año
     return df
 
-totaldf = pd.DataFrame()
-for año, url in urls.items():
-    df_temp = extraccion(url, año)
-    if not df_temp.empty:
-        totaldf = pd.concat([totaldf, df_temp], ignore_index=True)
-if totaldf.empty:
-    raise SystemExit("no hubo datos ")
-candidatas = [c for c in totaldf.columns if c in ('G', 'Goles', 'Goals') or 'Gol' in c]
-if not candidatas:
-    raise SystemExit("no hubo columnas")
-col_g = candidatas[0]
-totaldf.rename(columns={col_g: 'G'}, inplace=True)
-
-totaldf['G'] = pd.to_numeric(totaldf['G'], errors='coerce')
-totaldf.to_csv('goleadores_mundiales.csv', index=False)
-df_eq = totaldf.groupby(['Equipo', 'Año'])['G'].sum().reset_index()
-df_eq.to_csv('goles_por_equipo.csv', index=False)
-print("Los csv se crearon correctamente")
-print("Registros de goleadores al año")
-print(totaldf['Año'].value_counts().sort_index().to_string())
-print(f"filas en goleadores_mundiales.csv: {len(totaldf)}\n")
-print("Los registros de goles por equipo por año")
-print(df_eq['Año'].value_counts().sort_index().to_string())
-print(f"Total de filas en goles_por_equipo.csv: {len(df_eq)}")
+def extraccion(pool, cache, url, año, refrescar=False, solo_parsear=False):
+    html = None if refrescar else cache.leer(url, None if solo_parsear else vigencia_para(año))
+    if html is None and not solo_parsear:
+        html = obtener_html(pool, url)
+        if html is not None:
+            cache.guardar(url, html)
+    if html is None:
+        if solo_parsear:
+            print(f"{año}: no está en la caché")
+        return pd.DataFrame()
+    return parsear_tabla(html, año)
+
+def normalizar_goles(df):
+    candidatas = [c for c in df.columns if c in ('G', 'Goles', 'Goals') or 'Gol' in c]
+    if not candidatas:
+        return None
+    # Los tipos numéricos los pone limpiar_goleadores
+    return df.rename(columns={candidatas[0]: 'G'})
+
+class EscritorCSV:
+    # Agrega cada año a <ruta>.tmp apenas se parsea; lo ya escrito sobrevive a una caída.
+    # El CSV anterior solo se reemplaza al cerrar y si se escribió al menos un año
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._temporal = ruta + '.tmp'
+        self._archivo = open(self._temporal, 'w', encoding='utf-8', newline='')
+        self.columnas = None
+        self.filas_por_año = Counter()
+
+    def escribir(self, df):
+        encabezado = self.columnas is None
+        if encabezado:
+            self.columnas = list(df.columns)
+        df = df.reindex(columns=self.columnas)
+        df.to_csv(self._archivo, header=encabezado, index=False)
+        self._archivo.flush()
+        self.filas_por_año.update(df['Año'].tolist())
+
+    def cerrar(self):
+        self._archivo.close()
+        if self.filas_por_año:
+            os.replace(self._temporal, self.ruta)
+        else:
+            os.remove(self._temporal)
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper de goleadores de los mundiales en ESPN")
+    parser.add_argument('--navegadores', type=int, default=3,
+                        help="cantidad de Chrome headless que se usan en paralelo")
+    parser.add_argument('--cache', default='cache_html', help="carpeta de la caché de HTML")
+    parser.add_argument('--refresh', action='store_true',
+                        help="ignora la caché y vuelve a descargar todas las páginas")
+    parser.add_argument('--solo-parsear', action='store_true',
+                        help="regenera los CSV solo con el HTML guardado, sin abrir Chrome")
+    args = parser.parse_args()
+    if args.refresh and args.solo_parsear:
+        parser.error("--refresh y --solo-parsear no se pueden usar juntos")
+
+    cache = CacheHTML(args.cache)
+    # Los drivers se crean a demanda: si todo sale de la caché nunca se abre Chrome
+    pool = PoolDrivers(args.navegadores)
+    # Lo que sale de ESPN tal cual, para poder repetir la limpieza con limpieza.py sin volver a descargar
+    crudo = EscritorCSV('goleadores_mundiales_raw.csv')
+    escritor = EscritorCSV('goleadores_mundiales.csv')
+    # Los goles por (Equipo, Año) quedan cerrados al parsear el Mundial: se agregan como los goleadores
+    # y los tres CSV se reemplazan juntos al cerrar
+    equipos = EscritorCSV('goles_por_equipo.csv')
+    try:
+        with ThreadPoolExecutor(max_workers=args.navegadores) as ex:
+            resultados = ex.map(
+                lambda item: extraccion(pool, cache, item[1], item[0], args.refresh, args.solo_parsear),
+                urls.items())
+            for año, df_temp in zip(urls, resultados):
+                if df_temp.empty:
+                    continue
+                df_temp = normalizar_goles(df_temp)
+                if df_temp is None:
+                    print(f"{año}: no hubo columna de goles")
+                    continue
+                crudo.escribir(df_temp)
+                df_temp, reporte = limpiar_goleadores(df_temp)
+                print(reporte.texto())
+                escritor.escribir(df_temp)
+                equipos.escribir(equipos_desde_goleadores(df_temp))
+    finally:
+        crudo.cerrar()
+        escritor.cerrar()
+        equipos.cerrar()
+        pool.cerrar()
+
+    if not escritor.filas_por_año:
+        raise SystemExit("no hubo datos ")
+    print("Los csv se crearon correctamente")
+    print("Registros de goleadores al año")
+    print(pd.Series(escritor.filas_por_año).sort_index().to_string())
+    print(f"filas en goleadores_mundiales.csv: {sum(escritor.filas_por_año.values())}\n")
+    print("Los registros de goles por equipo por año")
+    print(pd.Series(equipos.filas_por_año).sort_index().to_string())
+    print(f"Total de filas en goles_por_equipo.csv: {sum(equipos.filas_por_año.values())}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import copy
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+def huellas_por_año(df: pd.DataFrame) -> Dict[int, int]:
+    # La huella es una suma de hashes por fila: la del total es la suma (mod 2**64) de las de cada año
+    if df.empty:
+        return {}
+    filas = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    años = df["Año"].to_numpy()
+    orden = np.argsort(años, kind="stable")
+    unicos, inicios = np.unique(años[orden], return_index=True)
+    sumas = np.add.reduceat(filas[orden], inicios)
+    return {int(a): int(s) for a, s in zip(unicos, sumas)}
+
+
+def sumar_huellas(huellas: Iterable[int]) -> int:
+    return sum(huellas) % 2**64
+
+
+class MatrizHeatmap:
+    # Matriz Equipo x Año como arreglo entero compacto, con los órdenes de filas ya calculados
+    def __init__(self, pivot: pd.DataFrame):
+        self.matriz = pivot.to_numpy(dtype="int16")
+        self.equipos = pivot.index.astype(str).to_numpy()
+        self.años = pivot.columns.to_numpy(dtype="int16")
+        self._posicion = {e: i for i, e in enumerate(self.equipos)}
+        totales = self.matriz.sum(axis=1, dtype="int64")
+        self.ordenes = {
+            "total": np.argsort(-totales, kind="stable"),
+            # Agrupa por el Mundial de mejor actuación y dentro de cada grupo por total de goles
+            "agrupado": np.lexsort((-totales, self.matriz.argmax(axis=1) if len(totales) else totales)),
+            "alfabetico": np.arange(len(self.equipos)),
+        }
+
+    def seleccionar(self, orden: str = "total", top: int = 0,
+                    equipos: Optional[Iterable[str]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if equipos:
+            # Zoom: solo los equipos pedidos, en el orden elegido
+            elegidos = [self._posicion[e] for e in equipos if e in self._posicion]
+            filas = self.ordenes.get(orden, self.ordenes["total"])
+            filas = filas[np.isin(filas, elegidos)]
+        else:
+            filas = self.ordenes.get(orden, self.ordenes["total"])
+            if top:
+                filas = filas[:top]
+        return self.matriz[filas], self.años, self.equipos[filas]
+
+
+class Agregados:
+    def __init__(self, losequipos: pd.DataFrame):
+        self.vacio = losequipos.iloc[0:0]
+        self.equipos_por_año: Dict[int, pd.DataFrame] = {
+            int(año): df.sort_values("G", ascending=False)
+            for año, df in losequipos.groupby("Año")
+        }
+        # Una columna del pivot por Mundial; pivot, heatmap y totales se arman con estas columnas
+        self._columnas: Dict[int, pd.Series] = {
+            año: df.groupby("Equipo", observed=True)["G"].sum() for año, df in self.equipos_por_año.items()
+        }
+        self._derivar()
+
+    def _derivar(self):
+        años = sorted(self._columnas)
+        if años:
+            pivot = pd.concat([self._columnas[a] for a in años], axis=1, keys=años).fillna(0).astype("int64")
+            pivot.index = pivot.index.astype(str)
+        else:
+            pivot = pd.DataFrame(dtype="int64")
+        pivot = pivot.sort_index()
+        pivot.index.name, pivot.columns.name = "Equipo", "Año"
+        self.pivot = pivot
+        self.heatmap = MatrizHeatmap(pivot)
+        self.totales_año = pd.DataFrame({"Año": años, "G": [int(self._columnas[a].sum()) for a in años]})
+
+    def con_cambios(self, cambios: Dict[int, pd.DataFrame]) -> "Agregados":
+        # Copia que solo recalcula los Mundiales de `cambios` (un DataFrame vacío borra el año);
+        # la instancia actual no se toca porque la siguen leyendo los callbacks
+        nuevo = copy.copy(self)
+        nuevo.equipos_por_año = dict(self.equipos_por_año)
+        nuevo._columnas = dict(self._columnas)
+        for año, df in cambios.items():
+            nuevo.equipos_por_año.pop(año, None)
+            nuevo._columnas.pop(año, None)
+            if not df.empty:
+                nuevo.equipos_por_año[año] = df.sort_values("G", ascending=False)
+                nuevo._columnas[año] = df.groupby("Equipo", observed=True)["G"].sum()
+        nuevo._derivar()
+        return nuevo
+
+    def equipos_año(self, año: int) -> pd.DataFrame:
+        return self.equipos_por_año.get(año, self.vacio)
@@ -0,0 +1,161 @@
+import argparse
+import importlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Perfil del arranque del dashboard y módulos pesados que se importan recién al usarlos.
+# `python arranque.py` importa el dashboard en procesos aparte, muestra qué paquetes pesan
+# y termina con error si se pasa del presupuesto o si algún módulo diferido se cargó al arrancar.
+# plotly.graph_objects y pyarrow no están: los importan dash y pandas por su cuenta
+MODULOS_DIFERIDOS = ("plotly.express", "pymongo")
+PRESUPUESTO_MS = float(os.environ.get("PRESUPUESTO_ARRANQUE_MS", "1500"))
+
+
+class Arranque:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._marca = time.perf_counter()
+        self.etapas: Dict[str, float] = {}
+        self.diferidos: Dict[str, float] = {}
+        self.cargados_al_arrancar: Optional[List[str]] = None
+
+    def marcar(self, etapa: str):
+        # Etapas del import en orden: cada una dura desde la marca anterior
+        ahora = time.perf_counter()
+        self.etapas[etapa] = (ahora - self._marca) * 1000
+        self._marca = ahora
+
+    @contextmanager
+    def etapa(self, nombre: str):
+        # Etapas que pueden repetirse después del arranque (p. ej. el layout); queda la última
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas[nombre] = (time.perf_counter() - inicio) * 1000
+
+    def importar(self, nombre: str):
+        inicio = time.perf_counter()
+        modulo = importlib.import_module(nombre)
+        with self._lock:
+            if nombre not in self.diferidos:
+                self.diferidos[nombre] = (time.perf_counter() - inicio) * 1000
+                logger.info(f"{nombre} importado al primer uso en {self.diferidos[nombre]:.0f} ms")
+        return modulo
+
+    def listo(self):
+        self.cargados_al_arrancar = [m for m in MODULOS_DIFERIDOS if m in sys.modules]
+        logger.info("Arranque: " + ", ".join(f"{e} {ms:.0f} ms" for e, ms in self.etapas.items()))
+        if self.cargados_al_arrancar:
+            logger.warning(f"Módulos diferidos cargados durante el arranque: {self.cargados_al_arrancar}")
+
+    def reporte(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "etapas_ms": dict(self.etapas),
+            "total_ms": sum(self.etapas.values()),
+            "diferidos_ms": dict(self.diferidos),
+            "cargados_al_arrancar": self.cargados_al_arrancar,
+        }
+
+
+ARRANQUE = Arranque()
+
+
+class ModuloDiferido:
+    # `px = ModuloDiferido("plotly.express")`: el import ocurre en el primer px.algo;
+    # `al_cargar` corre una vez después del import (p. ej. registrar una plantilla)
+    def __init__(self, nombre: str, al_cargar: Optional[Callable[[], None]] = None):
+        self._nombre = nombre
+        self._al_cargar = al_cargar
+        self._modulo = None
+
+    def __getattr__(self, atributo: str):
+        if self._modulo is None:
+            modulo = ARRANQUE.importar(self._nombre)
+            if self._al_cargar is not None:
+                self._al_cargar()
+            self._modulo = modulo
+        return getattr(self._modulo, atributo)
+
+
+def medir_import(modulo: str) -> dict:
+    codigo = (f"import json, time; t = time.perf_counter(); import {modulo}; "
+              "from arranque import ARRANQUE; r = ARRANQUE.reporte(); "
+              "r['import_ms'] = (time.perf_counter() - t) * 1000; print(json.dumps(r))")
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def detalle_imports(modulo: str) -> Dict[str, float]:
+    # -X importtime: ms acumulados por paquete de primer nivel
+    salida = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                            capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    # Cada import se imprime después de los suyos, con dos espacios más por nivel de anidamiento:
+    # los directos de `modulo` son los de nivel 1 justo antes de su propia línea
+    paquetes: Dict[str, float] = defaultdict(float)
+    directos: List[tuple] = []
+    for linea in salida.stderr.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        nivel = (len(nombre) - len(nombre.lstrip()) - 1) // 2
+        if nivel == 1:
+            directos.append((nombre.strip(), int(acumulado)))
+        elif nivel == 0:
+            if nombre.strip() == modulo:
+                for directo, microsegundos in directos:
+                    paquetes[directo.split(".")[0]] += microsegundos / 1000
+            directos = []
+    return dict(sorted(paquetes.items(), key=lambda p: -p[1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil y presupuesto de arranque del dashboard")
+    parser.add_argument("--modulo", default="dashboard1")
+    parser.add_argument("--presupuesto-ms", type=float, default=PRESUPUESTO_MS)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--salida", default=None, help="archivo JSON con el reporte")
+    args = parser.parse_args()
+
+    # El mejor de varios imports en frío: el primero también paga la caché de disco
+    corridas = [medir_import(args.modulo) for _ in range(args.repeticiones)]
+    mejor = min(corridas, key=lambda r: r["import_ms"])
+    paquetes = detalle_imports(args.modulo)
+
+    print(f"import {args.modulo}: {mejor['import_ms']:.0f} ms (presupuesto {args.presupuesto_ms:.0f} ms)")
+    for etapa, ms in mejor["etapas_ms"].items():
+        print(f"  etapa {etapa:<20} {ms:8.1f} ms")
+    print("Paquetes más pesados (-X importtime, acumulado):")
+    for paquete, ms in list(paquetes.items())[:args.top]:
+        print(f"  {paquete:<28} {ms:8.1f} ms")
+
+    errores = []
+    if mejor["import_ms"] > args.presupuesto_ms:
+        errores.append(f"el import tarda {mejor['import_ms']:.0f} ms, más que el presupuesto")
+    if mejor["cargados_al_arrancar"]:
+        errores.append(f"módulos diferidos importados al arrancar: {mejor['cargados_al_arrancar']}")
+    for error in errores:
+        print(f"ERROR: {error}")
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({"arranque": mejor, "paquetes_ms": paquetes, "presupuesto_ms": args.presupuesto_ms,
+                       "errores": errores}, f, ensure_ascii=False, indent=2)
+    raise SystemExit(1 if errores else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+// Carga diferida de la sección de goleadores (CARGA_DIFERIDA=1).
+// Cuando la sección se acerca a la pantalla se pulsa el botón oculto "activar-goleadores";
+// sus n_clicks son la entrada que habilita los callbacks de esa sección.
+(function () {
+    function activar(seccion, boton) {
+        if (!("IntersectionObserver" in window)) {
+            boton.click();
+            return;
+        }
+        var observador = new IntersectionObserver(function (entradas) {
+            if (entradas.some(function (e) { return e.isIntersecting; })) {
+                observador.disconnect();
+                boton.click();
+            }
+        }, {rootMargin: "300px 0px"});
+        observador.observe(seccion);
+    }
+
+    function buscar() {
+        var seccion = document.getElementById("seccion-goleadores");
+        var boton = document.getElementById("activar-goleadores");
+        if (seccion && boton) {
+            activar(seccion, boton);
+            return true;
+        }
+        return false;
+    }
+
+    // Dash monta el layout después de cargar los scripts de assets/, y puede tardar
+    // (servidor en frío, red lenta): se espera a que aparezca sin límite de tiempo
+    if (buscar()) {
+        return;
+    }
+    var mutaciones = new MutationObserver(function () {
+        if (buscar()) {
+            mutaciones.disconnect();
+        }
+    });
+    mutaciones.observe(document.documentElement, {childList: true, subtree: true});
+})();
@@ -0,0 +1,91 @@
+// Filtro por goles y gráficas de goleadores en el navegador (MODO_CLIENTE=1).
+// El servidor solo manda los goleadores del Mundial elegido, ya ordenados por goles.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    goleadores: {
+        actualizar: function (datos, rng, plantillas) {
+            if (!datos || !plantillas) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            var lo = Math.min(rng[0], rng[1]);
+            var hi = Math.max(rng[0], rng[1]);
+            var filas = [];
+            for (var i = 0; i < datos.G.length; i++) {
+                if (datos.G[i] >= lo && datos.G[i] <= hi) {
+                    filas.push({Jugador: datos.Jugador[i], Equipo: datos.Equipo[i], G: datos.G[i], "Año": datos.año});
+                }
+            }
+
+            function layout(titulo, extra) {
+                return Object.assign({template: plantillas.template, title: {text: titulo}}, extra || {});
+            }
+
+            // Una traza por equipo, en el orden en que aparece cada uno (como color="Equipo" en px)
+            function porEquipo(rows, trazo) {
+                var orden = [];
+                var grupos = {};
+                rows.forEach(function (r) {
+                    if (!(r.Equipo in grupos)) {
+                        grupos[r.Equipo] = [];
+                        orden.push(r.Equipo);
+                    }
+                    grupos[r.Equipo].push(r);
+                });
+                return orden.map(function (eq) { return trazo(eq, grupos[eq]); });
+            }
+
+            function columna(rows, campo) {
+                return rows.map(function (r) { return r[campo]; });
+            }
+
+            var top10 = filas.slice(0, 10);
+            var bar = {
+                data: porEquipo(top10, function (eq, rs) {
+                    return {type: "bar", name: eq, legendgroup: eq, x: columna(rs, "Jugador"), y: columna(rs, "G"),
+                            text: columna(rs, "G"), textposition: "outside"};
+                }),
+                layout: layout("Top Goleadores - Mundial " + datos.año,
+                               {barmode: "relative", legend: {title: {text: "Equipo"}},
+                                xaxis: {title: {text: "Jugador"}}, yaxis: {title: {text: "G"}}})
+            };
+
+            var sumas = {};
+            var equipos = [];
+            filas.forEach(function (r) {
+                if (!(r.Equipo in sumas)) {
+                    sumas[r.Equipo] = 0;
+                    equipos.push(r.Equipo);
+                }
+                sumas[r.Equipo] += r.G;
+            });
+            var treemap = {
+                data: [{type: "treemap", ids: equipos, labels: equipos, parents: equipos.map(function () { return ""; }),
+                        values: equipos.map(function (eq) { return sumas[eq]; }), branchvalues: "total"}],
+                layout: layout("Goles por País")
+            };
+
+            var maxG = filas.length ? filas[0].G : 0;
+            var radar = {
+                data: filas.slice(0, 5).map(function (r) {
+                    return {type: "scatterpolar", r: [r.G, r.G, r.G, r.G, r.G],
+                            theta: ["Goles", "Goles", "Goles", "Goles", "Goles"], fill: "toself", name: r.Jugador};
+                }),
+                layout: layout("Comparativa Top 5", {polar: {radialaxis: {visible: true, range: [0, maxG]}}})
+            };
+
+            // Mismo escalado de burbujas que px.scatter(size=...) con size_max=20
+            var sizeref = maxG > 0 ? 2 * maxG / (20 * 20) : 1;
+            var scatter = {
+                data: porEquipo(filas, function (eq, rs) {
+                    return {type: "scatter", mode: "markers", name: eq, legendgroup: eq,
+                            x: columna(rs, "G"), y: columna(rs, "Jugador"),
+                            marker: {size: columna(rs, "G"), sizemode: "area", sizeref: sizeref}};
+                }),
+                layout: layout("Rendimiento Individual",
+                               {legend: {title: {text: "Equipo"}, itemsizing: "constant"},
+                                xaxis: {title: {text: "G"}}, yaxis: {title: {text: "Jugador"}}})
+            };
+
+            return [bar, treemap, radar, scatter, filas.slice(0, 15)];
+        }
+    }
+});
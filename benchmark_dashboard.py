@@ -0,0 +1,210 @@
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+# Benchmark de los callbacks con datos sintéticos; no necesita MongoDB ni red.
+# Uso:
+#   python benchmark_dashboard.py --escalas 1 10 --guardar      (escribe la línea base)
+#   python benchmark_dashboard.py --escalas 1 10 --comparar     (falla si algo empeora más que --tolerancia)
+
+MUNDIALES = [1930, 1934, 1938] + list(range(1950, 2023, 4))
+EQUIPOS_BASE = 80
+GOLEADORES_POR_MUNDIAL = 1500
+LINEA_BASE = "benchmark_linea_base.json"
+
+
+def generar_datos(escala: int, semilla: int = 181184):
+    from cargador import tipos_compactos
+
+    rng = np.random.default_rng(semilla)
+    n_equipos = EQUIPOS_BASE * escala
+    por_mundial = GOLEADORES_POR_MUNDIAL * escala
+    n = por_mundial * len(MUNDIALES)
+    equipos = np.array([f"Selección {i:05d}" for i in range(n_equipos)])
+    goleadores = pd.DataFrame({
+        "Jugador": np.char.add("Jugador ", rng.integers(0, n // 3, n).astype(str)),
+        "Equipo": equipos[rng.integers(0, n_equipos, n)],
+        "Año": np.repeat(MUNDIALES, por_mundial),
+        # Pocos goles por jugador, con cola larga como en los datos reales
+        "G": np.minimum(rng.geometric(0.45, n), 16),
+    })
+    losequipos = goleadores.groupby(["Equipo", "Año"])["G"].sum().reset_index()
+    return tipos_compactos(losequipos), tipos_compactos(goleadores)
+
+
+def percentiles(tiempos):
+    ms = np.array(tiempos) * 1000
+    return {
+        "n": len(tiempos),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "media_ms": float(statistics.fmean(ms)),
+        "por_segundo": float(len(tiempos) / max(sum(tiempos), 1e-9)),
+    }
+
+
+def medir(llamar, casos, limpiar=None, repeticiones=1, calentar=False):
+    # calentar: una pasada sin medir antes; si la corrida anterior limpió la caché, la primera
+    # repetición "caliente" serían todos fallos y el p95 mediría la caché fría
+    if calentar:
+        for caso in casos:
+            llamar(*caso)
+    tiempos = []
+    for _ in range(repeticiones):
+        for caso in casos:
+            if limpiar is not None:
+                limpiar()
+            inicio = time.perf_counter()
+            llamar(*caso)
+            tiempos.append(time.perf_counter() - inicio)
+    return percentiles(tiempos)
+
+
+def cuerpo_dash(salidas, entradas):
+    # El mismo JSON que manda el navegador a /_dash-update-component.
+    # Con una sola salida Dash registra "id.prop" (sin los puntos de las salidas múltiples) y un objeto
+    if len(salidas) == 1:
+        (i, p), = salidas
+        output, outputs = f"{i}.{p}", {"id": i, "property": p}
+    else:
+        output = ".." + "...".join(f"{i}.{p}" for i, p in salidas) + ".."
+        outputs = [{"id": i, "property": p} for i, p in salidas]
+    return {
+        "output": output,
+        "outputs": outputs,
+        "inputs": [{"id": i, "property": p, "value": v} for i, p, v in entradas],
+        "changedPropIds": [f"{entradas[0][0]}.{entradas[0][1]}"],
+        "state": [],
+    }
+
+
+def benchmark_escala(tablero, escala: int, repeticiones: int) -> dict:
+    from cargador import tipos_compactos
+    from gestor_datos import instantanea_memoria
+    from incremental import aplicar_cambios, diferencia
+
+    inicio = time.perf_counter()
+    losequipos, goleadores = generar_datos(escala)
+    snap = instantanea_memoria(losequipos, goleadores)
+    preparacion = time.perf_counter() - inicio
+    tablero.gestor.publicar(snap)
+    cache = tablero.cache_figuras
+
+    max_g = snap.max_goles
+    casos_equipos = [(a, v) for a in snap.años_equipos for v in ("top10", "todos")]
+    casos_goleadores = [(a, [lo, max_g]) for a in snap.años_goleadores for lo in (0, 2, 5)]
+    casos_heatmap = [(orden, top, []) for orden in ("total", "agrupado") for top in (25, 0)]
+    historico = snap.historico
+    casos_historico = [(historico.top_naciones(n), historico.etiquetas(n)) for n in (1, 6, 20)]
+
+    resultado = {
+        "escala": escala,
+        "filas_goleadores": len(goleadores),
+        "filas_equipos": len(losequipos),
+        "preparacion_s": preparacion,
+        "memoria_datos_mb": float(losequipos.memory_usage(deep=True).sum()
+                                  + goleadores.memory_usage(deep=True).sum()) / 2**20,
+        "equipos_frio": medir(tablero.actualizar_equipos, casos_equipos, cache.limpiar, repeticiones),
+        "equipos_caliente": medir(tablero.actualizar_equipos, casos_equipos, None, repeticiones, calentar=True),
+        "goleadores_frio": medir(tablero.actualizar_goleadores, casos_goleadores, cache.limpiar, repeticiones),
+        "goleadores_caliente": medir(tablero.actualizar_goleadores, casos_goleadores, None, repeticiones,
+                                     calentar=True),
+        "heatmap_frio": medir(tablero.actualizar_heatmap, casos_heatmap, cache.limpiar, repeticiones),
+        "historico_frio": medir(tablero.actualizar_historico, casos_historico, cache.limpiar, repeticiones),
+    }
+
+    cliente = tablero.app.server.test_client()
+    salidas_eq = [("bar-equipos", "figure"), ("pie-equipos", "figure"), ("line-equipos", "figure")]
+    salidas_gol = [("bar-goleadores", "figure"), ("treemap-goleadores", "figure"), ("radar-goleadores", "figure"),
+                   ("scatter-goleadores", "figure"), ("tabla-goleadores", "data")]
+
+    def http_equipos(año, vista):
+        r = cliente.post("/_dash-update-component", json=cuerpo_dash(
+            salidas_eq, [("anio-equipos", "value", año), ("vista-equipos", "value", vista)]))
+        assert r.status_code == 200, r.status_code
+
+    def http_goleadores(año, rng):
+        r = cliente.post("/_dash-update-component", json=cuerpo_dash(
+            salidas_gol, [("anio-goleadores", "value", año), ("goles-range", "value", rng)]))
+        assert r.status_code == 200, r.status_code
+
+    resultado["http_equipos_frio"] = medir(http_equipos, casos_equipos, cache.limpiar, repeticiones)
+    resultado["http_goleadores_frio"] = medir(http_goleadores, casos_goleadores, cache.limpiar, repeticiones)
+    resultado["http_goleadores_caliente"] = medir(http_goleadores, casos_goleadores, None, repeticiones,
+                                                       calentar=True)
+
+    # Refresco cuando llega un Mundial nuevo: reconstrucción completa contra aplicar solo ese año
+    ultimo = int(goleadores["Año"].max())
+    previa = instantanea_memoria(*(tipos_compactos(df[df["Año"] != ultimo].reset_index(drop=True))
+                                   for df in (losequipos, goleadores)))
+    resultado["refresco_completo"] = medir(lambda: instantanea_memoria(losequipos, goleadores), [()],
+                                           None, repeticiones)
+    resultado["refresco_incremental"] = medir(
+        lambda: aplicar_cambios(previa, diferencia(previa, losequipos, goleadores), losequipos, goleadores),
+        [()], None, repeticiones)
+
+    # Pico de memoria del proceso hasta esta escala (las escalas corren de menor a mayor)
+    resultado["maxrss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return resultado
+
+
+def comparar(actual: dict, base: dict, tolerancia: float) -> list:
+    regresiones = []
+    for escala, medidas in actual.items():
+        for nombre, valor in medidas.items():
+            previo = base.get(escala, {}).get(nombre)
+            if isinstance(valor, dict) and isinstance(previo, dict) and "p95_ms" in valor:
+                if valor["p95_ms"] > previo["p95_ms"] * (1 + tolerancia):
+                    regresiones.append(f"escala {escala} {nombre}: p95 {previo['p95_ms']:.1f} -> {valor['p95_ms']:.1f} ms")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los callbacks del dashboard con datos sintéticos")
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--salida", default=None, help="archivo JSON con los resultados")
+    parser.add_argument("--guardar", action="store_true", help=f"guarda los resultados como {LINEA_BASE}")
+    parser.add_argument("--comparar", action="store_true", help=f"compara contra {LINEA_BASE}")
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    args = parser.parse_args()
+    # Se revisa antes de correr: la línea base falta en un clon nuevo y el benchmark tarda minutos
+    if args.comparar and not args.guardar and not os.path.exists(LINEA_BASE):
+        parser.error(f"no existe {LINEA_BASE}; primero hay que generarla con --guardar (con las mismas --escalas)")
+
+    # Sin MongoDB, sin snapshot previo y con los callbacks del servidor registrados sin diferir
+    os.environ.update({"REFRESCO_MONGO": "0", "MODO_CONSULTA": "memoria", "MODO_CLIENTE": "0",
+                       "CARGA_DIFERIDA": "0", "SNAPSHOT_DIR": tempfile.mkdtemp(prefix="bench-snapshot-")})
+    os.environ.pop("CACHE_FIGURAS_DIR", None)
+    import dashboard1 as tablero
+
+    resultados = {}
+    for escala in sorted(args.escalas):
+        print(f"escala x{escala}...", file=sys.stderr)
+        resultados[str(escala)] = benchmark_escala(tablero, escala, args.repeticiones)
+    texto = json.dumps(resultados, indent=2, ensure_ascii=False)
+    print(texto)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    if args.guardar:
+        with open(LINEA_BASE, "w", encoding="utf-8") as f:
+            f.write(texto)
+    if args.comparar:
+        with open(LINEA_BASE, "r", encoding="utf-8") as f:
+            regresiones = comparar(resultados, json.load(f), args.tolerancia)
+        for r in regresiones:
+            print(f"REGRESIÓN {r}", file=sys.stderr)
+        raise SystemExit(1 if regresiones else 0)
+
+
+if __name__ == "__main__":
+    main()
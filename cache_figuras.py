@@ -0,0 +1,133 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+import plotly.utils
+
+logger = logging.getLogger(__name__)
+
+# medir(clave, etapa, segundos): gancho opcional para registrar el tiempo de serialización
+Medidor = Optional[Callable[[Hashable, str, float], None]]
+
+
+def serializar(clave: Hashable, construir: Callable, medir: Medidor) -> str:
+    figuras = construir()
+    inicio = time.perf_counter()
+    carga = json.dumps(figuras, cls=plotly.utils.PlotlyJSONEncoder)
+    if medir is not None:
+        medir(clave, "serializacion", time.perf_counter() - inicio)
+    return carga
+
+
+class CacheFiguras:
+    def __init__(self, capacidad: int = 256, medir: Medidor = None):
+        self.capacidad = capacidad
+        self.medir = medir
+        self._datos: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave: Hashable, construir: Callable):
+        with self._lock:
+            carga = self._datos.get(clave)
+            if carga is not None:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+            else:
+                self.fallos += 1
+        if carga is None:
+            # Se guarda el JSON ya serializado; las figuras se construyen fuera del lock
+            carga = serializar(clave, construir, self.medir)
+            with self._lock:
+                self._datos[clave] = carga
+                self._datos.move_to_end(clave)
+                while len(self._datos) > self.capacidad:
+                    self._datos.popitem(last=False)
+        return json.loads(carga)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / total if total else 0.0,
+                "entradas": len(self._datos),
+                "capacidad": self.capacidad,
+            }
+
+
+class CacheFigurasDisco:
+    # Misma interfaz que CacheFiguras, pero en archivos: la comparten todos los workers de la máquina.
+    # La antigüedad para el LRU es el mtime, que se renueva en cada acierto.
+    # La carpeta sobrevive a los deploys: `version_codigo` entra en cada clave para no servir figuras
+    # armadas por código viejo (las de versiones anteriores las termina de borrar el LRU)
+    def __init__(self, carpeta: str, capacidad: int = 1024, medir: Medidor = None, version_codigo: str = ""):
+        self.carpeta = carpeta
+        self.version_codigo = version_codigo
+        self.capacidad = capacidad
+        self.medir = medir
+        self.aciertos = 0
+        self.fallos = 0
+        os.makedirs(carpeta, exist_ok=True)
+
+    def _ruta(self, clave: Hashable) -> str:
+        return os.path.join(self.carpeta, hashlib.sha1(repr((self.version_codigo, clave)).encode("utf-8")).hexdigest() + ".json")
+
+    def obtener(self, clave: Hashable, construir: Callable):
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, "r", encoding="utf-8") as f:
+                carga = f.read()
+            os.utime(ruta)
+            self.aciertos += 1
+        except OSError:
+            self.fallos += 1
+            carga = serializar(clave, construir, self.medir)
+            temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                f.write(carga)
+            os.replace(temporal, ruta)
+            self._podar()
+        return json.loads(carga)
+
+    def _entradas(self):
+        return [e for e in os.scandir(self.carpeta) if e.name.endswith(".json")]
+
+    def _podar(self):
+        entradas = self._entradas()
+        if len(entradas) <= self.capacidad:
+            return
+        entradas.sort(key=lambda e: e.stat().st_mtime)
+        for e in entradas[:len(entradas) - self.capacidad]:
+            try:
+                os.remove(e.path)
+            except OSError:
+                pass
+
+    def limpiar(self):
+        for e in self._entradas():
+            try:
+                os.remove(e.path)
+            except OSError:
+                pass
+
+    def estadisticas(self) -> dict:
+        # Los contadores son de este worker; las entradas son las de la carpeta compartida
+        total = self.aciertos + self.fallos
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": self.aciertos / total if total else 0.0,
+            "entradas": len(self._entradas()),
+            "capacidad": self.capacidad,
+        }
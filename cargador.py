@@ -0,0 +1,43 @@
+from typing import Iterable, List, Optional
+import pandas as pd
+
+# Solo las columnas que usa el dashboard
+COLUMNAS = {
+    "goles_por_equipo": ["Equipo", "Año", "G"],
+    "goleadores_mundiales": ["Jugador", "Equipo", "Año", "G"],
+}
+NUMERICAS = ("G", "Año")
+CATEGORICAS = ("Equipo", "Jugador")
+
+
+def a_entero(campo: str) -> dict:
+    # Convierte en Mongo tanto enteros como textos tipo "8" o "8.0"; lo que no es número queda null
+    return {"$toInt": {"$convert": {"input": f"${campo}", "to": "double", "onError": None, "onNull": None}}}
+
+
+def pipeline_carga(columnas: List[str], años: Optional[Iterable[int]] = None) -> list:
+    pipeline = []
+    if años:
+        años = [int(a) for a in años]
+        # Se aceptan también los documentos migrados antes, con Año como texto
+        pipeline.append({"$match": {"Año": {"$in": años + [str(a) for a in años]}}})
+    proyeccion = {"_id": 0}
+    for c in columnas:
+        proyeccion[c] = a_entero(c) if c in NUMERICAS else 1
+    pipeline.append({"$project": proyeccion})
+    return pipeline
+
+
+def tipos_compactos(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.dropna(subset=[c for c in NUMERICAS if c in df.columns])
+    tipos = {c: "int16" for c in NUMERICAS if c in df.columns}
+    tipos.update({c: "category" for c in CATEGORICAS if c in df.columns})
+    return df.astype(tipos).reset_index(drop=True)
+
+
+def cargar_coleccion(db, coleccion: str, años: Optional[Iterable[int]] = None,
+                     tamaño_lote: int = 5000) -> pd.DataFrame:
+    columnas = COLUMNAS[coleccion]
+    cursor = db[coleccion].aggregate(pipeline_carga(columnas, años), batchSize=tamaño_lote)
+    df = pd.DataFrame.from_records(cursor, columns=columnas)
+    return tipos_compactos(df)
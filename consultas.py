@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import zlib
+from typing import Callable, List
+import pandas as pd
+
+# Índices compuestos que usan los pipelines; los crea también la migración
+INDICES = {
+    "goles_por_equipo": [[("Año", 1), ("G", -1)], [("Equipo", 1), ("Año", 1)]],
+    "goleadores_mundiales": [[("Año", 1), ("G", -1)], [("Equipo", 1), ("Año", 1)]],
+}
+
+
+# Cada documento guarda el crc32 de su contenido (lo escribe la migración); la versión suma las huellas por Mundial
+CAMPO_HUELLA = "huella"
+
+
+def huella_documento(doc: dict) -> int:
+    # Sin _id ni la propia huella; un crc32 por fila cabe de sobra en int64 al sumarse
+    contenido = {k: v for k, v in doc.items() if k not in ("_id", CAMPO_HUELLA)}
+    return zlib.crc32(json.dumps(contenido, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def crear_indices(db):
+    for coleccion, indices in INDICES.items():
+        for claves in indices:
+            db[coleccion].create_index(claves)
+
+
+class ConsultasMongo:
+    # Mismas respuestas que Agregados/IndiceGoleadores, pero calculadas en MongoDB
+    def __init__(self, conectar: Callable):
+        self._conectar = conectar
+        self._pid = None
+        self._db = None
+
+    def _base(self):
+        # MongoClient no sobrevive a un fork: cada proceso (worker) abre su propia conexión
+        if self._pid != os.getpid():
+            self._db = self._conectar()
+            self._pid = os.getpid()
+        return self._db
+
+    @property
+    def equipos(self):
+        return self._base()["goles_por_equipo"]
+
+    @property
+    def goleadores(self):
+        return self._base()["goleadores_mundiales"]
+
+    @staticmethod
+    def _huella(coll) -> str:
+        # Filas, goles y suma de huellas por Mundial: cambia al renombrar un jugador o equipo o al mover
+        # goles entre filas. Un documento sin huella (escrito fuera de la migración) solo aporta n y G
+        cursor = coll.aggregate([
+            {"$group": {"_id": "$Año", "n": {"$sum": 1}, "G": {"$sum": "$G"},
+                        "huella": {"$sum": f"${CAMPO_HUELLA}"}}},
+            {"$sort": {"_id": 1}},
+        ])
+        resumen = [[doc["_id"], doc["n"], doc["G"], doc["huella"]] for doc in cursor]
+        return hashlib.sha1(json.dumps(resumen, default=str).encode("utf-8")).hexdigest()[:16]
+
+    def version(self) -> str:
+        return f"{self._huella(self.equipos)}-{self._huella(self.goleadores)}"
+
+    def años(self, coleccion: str) -> List[int]:
+        coll = self.equipos if coleccion == "goles_por_equipo" else self.goleadores
+        return sorted(int(a) for a in coll.distinct("Año") if a is not None)
+
+    def max_goles(self) -> int:
+        doc = next(self.goleadores.find({}, {"_id": 0, "G": 1}).sort("G", -1).limit(1), None)
+        return int(doc["G"]) if doc else 0
+
+    def equipos_año(self, año: int) -> pd.DataFrame:
+        cursor = self.equipos.aggregate([
+            {"$match": {"Año": año}},
+            {"$group": {"_id": "$Equipo", "G": {"$sum": "$G"}}},
+            {"$sort": {"G": -1}},
+            {"$project": {"_id": 0, "Equipo": "$_id", "Año": {"$literal": año}, "G": 1}},
+        ])
+        return pd.DataFrame.from_records(cursor, columns=["Equipo", "Año", "G"])
+
+    def totales_año(self) -> pd.DataFrame:
+        cursor = self.equipos.aggregate([
+            {"$group": {"_id": "$Año", "G": {"$sum": "$G"}}},
+            {"$sort": {"_id": 1}},
+            {"$project": {"_id": 0, "Año": "$_id", "G": 1}},
+        ])
+        return pd.DataFrame.from_records(cursor, columns=["Año", "G"])
+
+    def pivot(self) -> pd.DataFrame:
+        cursor = self.equipos.aggregate([
+            {"$group": {"_id": {"Equipo": "$Equipo", "Año": "$Año"}, "G": {"$sum": "$G"}}},
+            {"$project": {"_id": 0, "Equipo": "$_id.Equipo", "Año": "$_id.Año", "G": 1}},
+        ])
+        # Mongo ya agrupó; aquí solo se acomoda la matriz Equipo x Año
+        df = pd.DataFrame.from_records(cursor, columns=["Equipo", "Año", "G"])
+        return df.pivot(index="Equipo", columns="Año", values="G").fillna(0).astype(int).sort_index()
+
+    def goles_jugador_año(self) -> pd.DataFrame:
+        # Base de los acumulados históricos; se pide una vez por versión, no por request
+        cursor = self.goleadores.aggregate([
+            {"$group": {"_id": {"Jugador": "$Jugador", "Equipo": "$Equipo", "Año": "$Año"}, "G": {"$sum": "$G"}}},
+            {"$project": {"_id": 0, "Jugador": "$_id.Jugador", "Equipo": "$_id.Equipo", "Año": "$_id.Año", "G": 1}},
+        ], allowDiskUse=True)
+        return pd.DataFrame.from_records(cursor, columns=["Jugador", "Equipo", "Año", "G"])
+
+    def goleadores_rango(self, año: int, lo: int, hi: int) -> pd.DataFrame:
+        cursor = self.goleadores.find(
+            {"Año": año, "G": {"$gte": lo, "$lte": hi}},
+            {"_id": 0, "Jugador": 1, "Equipo": 1, "Año": 1, "G": 1},
+        ).sort("G", -1)
+        return pd.DataFrame.from_records(cursor, columns=["Jugador", "Equipo", "Año", "G"])
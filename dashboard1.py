@@ -1,14 +1,36 @@
+import json
 import logging
-from typing import Tuple
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import Optional, Tuple
+# Va primero: su import marca el inicio del perfil de arranque
+from arranque import ARRANQUE, ModuloDiferido
 import dash
-from dash import html, dcc, Input, Output, dash_table
+import flask
+from dash import html, dcc, Input, Output, State, dash_table, ClientsideFunction
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from pymongo import MongoClient
 import base64
+import glob
+import gzip
+import hashlib
+import importlib.metadata
+import math
 import os
+import re
+from cache_figuras import CacheFiguras, CacheFigurasDisco
+from cargador import cargar_coleccion, tipos_compactos
+from exportar import FORMATOS, disponible, etiqueta, serializar
+from consultas import ConsultasMongo
+from gestor_datos import GestorDatos, Instantanea, instantanea_memoria
+from incremental import aplicar_cambios, cargar_cambios, diferencia
+from snapshots import cargar_snapshot, exportar_snapshot, tomar_candado, version_snapshot
+from metricas import LIMITES_BYTES, Metricas
+from agregados import MatrizHeatmap
+from historico import COLUMNAS_CARRERA, Historico
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,6 +38,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+metricas = Metricas()
+metricas.histograma("dash_callback_segundos", "Duración total de cada callback del dashboard")
+metricas.histograma("dash_callback_etapa_segundos", "Duración de cada etapa dentro de los callbacks")
+metricas.histograma("dash_request_segundos", "Latencia HTTP de _dash-update-component")
+metricas.histograma("dash_respuesta_bytes", "Tamaño de las respuestas de _dash-update-component", LIMITES_BYTES)
+metricas.histograma("datos_carga_segundos", "Duración de datoss() leyendo MongoDB")
+# Callbacks más lentos que esto (en ms) se registran en el log
+UMBRAL_LENTO_MS = float(os.environ.get("UMBRAL_LENTO_MS", "500"))
+
+@contextmanager
+def medir_callback(callback: str, *args):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracion = time.perf_counter() - inicio
+        metricas.observar("dash_callback_segundos", duracion, callback=callback)
+        if duracion * 1000 > UMBRAL_LENTO_MS:
+            logger.warning(f"Callback lento: {callback}{args} tardó {duracion * 1000:.0f} ms")
+
+def medir_etapa(callback: str, etapa: str, inicio: float) -> float:
+    ahora = time.perf_counter()
+    metricas.observar("dash_callback_etapa_segundos", ahora - inicio, callback=callback, etapa=etapa)
+    return ahora
+
 COLORS = {
     'primary': '#C51D34',
     'secondary': '#F5F5F5',
@@ -27,40 +74,229 @@ COLORS = {
     'info': '#3498DB',
     'white': '#FFFFFF'
 }
+# Plantilla única para todas las figuras: reemplaza al template completo de Plotly que px mete en cada
+# respuesta y a los update_layout repetidos con el fondo transparente
+_plantilla_registrada = False
+
+def registrar_plantilla():
+    # La llaman los tres módulos diferidos de plotly; solo el primero que se carga la registra
+    global _plantilla_registrada
+    if _plantilla_registrada:
+        return
+    import plotly.express as px
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    pio.templates["estadistigol"] = go.layout.Template(layout=dict(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=COLORS['dark_gray']),
+        colorway=px.colors.qualitative.Plotly,
+        colorscale=dict(sequential=px.colors.sequential.Plasma),
+        xaxis=dict(gridcolor='#E5ECF6', automargin=True),
+        yaxis=dict(gridcolor='#E5ECF6', automargin=True),
+        hovermode='closest',
+    ))
+    pio.templates.default = "estadistigol"
+    _plantilla_registrada = True
+
+# plotly se importa en el primer callback que arma figuras (y ahí se registra la plantilla) y pymongo
+# en la primera conexión; ninguno hace falta para levantar el servidor (ver arranque.py)
+px = ModuloDiferido("plotly.express", registrar_plantilla)
+go = ModuloDiferido("plotly.graph_objects", registrar_plantilla)
+pio = ModuloDiferido("plotly.io", registrar_plantilla)
+MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/")
+# "memoria" carga las colecciones en pandas; "mongo" resuelve cada consulta con pipelines en MongoDB
+MODO_CONSULTA = os.environ.get("MODO_CONSULTA", "memoria")
+# Mundiales a cargar, p. ej. MUNDIALES=2014,2018,2022; vacío carga todos
+MUNDIALES = [int(a) for a in os.environ.get("MUNDIALES", "").split(",") if a.strip()]
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", "snapshot")
+# Con MODO_CLIENTE=1 el filtro por goles y sus gráficas se resuelven en el navegador (assets/goleadores.js)
+MODO_CLIENTE = os.environ.get("MODO_CLIENTE", "0") == "1"
+# Con REFRESCO_MONGO=0 el dashboard sirve solo el snapshot local y no toca MongoDB
+REFRESCO_MONGO = os.environ.get("REFRESCO_MONGO", "1") == "1"
+# Con CARGA_DIFERIDA=1 las gráficas de goleadores se calculan recién cuando la sección entra en pantalla
+CARGA_DIFERIDA = os.environ.get("CARGA_DIFERIDA", "1") == "1"
+# Segundos de caché para imágenes de assets/ sin huella; los CSS/JS que Dash versiona con ?m= se cachean un año
+CACHE_ASSETS_S = int(os.environ.get("CACHE_ASSETS_S", "604800"))
+# Con GRABAR_REQUESTS=archivo.jsonl cada _dash-update-component se agrega al archivo; prueba_carga.py los repite
+GRABAR_REQUESTS = os.environ.get("GRABAR_REQUESTS")
+
+def conectar():
+    from pymongo import MongoClient
+    return MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)["LasEstadisticasMundial"]
+
 def datoss() -> Tuple[pd.DataFrame, pd.DataFrame]:
-    try:
-        ruta = MongoClient("mongodb://localhost:27017/", serverSelectionTimeoutMS=5000)
-        db = ruta["LasEstadisticasMundial"]
-        losequipos = pd.DataFrame(list(db["goles_por_equipo"].find()))
-        goleadores = pd.DataFrame(list(db["goleadores_mundiales"].find()))
-        # Eliminar campo _id
-        for df in (losequipos, goleadores):
-            if "_id" in df.columns:
-                df.drop(columns=["_id"], inplace=True)
-            df["G"] = pd.to_numeric(df["G"], errors="coerce")
-            df["Año"] = pd.to_numeric(df["Año"], errors="coerce")
-        logger.info("Datos cargados desde MongoDB")
-        return losequipos, goleadores
-    except Exception as e:
-        logger.error(f"Error conectando a MongoDB: {e}")
-        losequipos = pd.DataFrame({
-            'Equipo': ['Brasil','Alemania','Argentina','España','Francia'],
-            'Año': [2022]*5,
-            'G': [8,7,6,5,4]
-        })
-        goleadores = pd.DataFrame({
-            'Jugador': ['Messi','Mbappé','Giroud','Álvarez','Gakpo'],
-            'Equipo': ['Argentina','Francia','Francia','Argentina','Países Bajos'],
-            'Año': [2022]*5,
-            'G': [7,8,4,4,3]
-        })
-        return losequipos, goleadores
-losequipos, goleadores = datoss()
+    inicio = time.perf_counter()
+    db = conectar()
+    # Proyección, filtro por año y tipos numéricos se resuelven en MongoDB
+    losequipos = cargar_coleccion(db, "goles_por_equipo", MUNDIALES)
+    goleadores = cargar_coleccion(db, "goleadores_mundiales", MUNDIALES)
+    if losequipos.empty or goleadores.empty:
+        # Colección vacía o MUNDIALES sin coincidencias: es una carga fallida, no datos nuevos
+        raise ValueError(f"MongoDB devolvió {len(losequipos)} equipos y {len(goleadores)} goleadores"
+                         + (f" para MUNDIALES={MUNDIALES}" if MUNDIALES else ""))
+    duracion = time.perf_counter() - inicio
+    metricas.observar("datos_carga_segundos", duracion)
+    metricas.fijar("datos_ultima_carga_segundos", duracion, "Duración de la última carga desde MongoDB")
+    logger.info(f"Datos cargados desde MongoDB en {duracion:.2f}s")
+    return losequipos, goleadores
+
+def datos_respaldo() -> Tuple[pd.DataFrame, pd.DataFrame]:
+    losequipos = pd.DataFrame({
+        'Equipo': ['Brasil','Alemania','Argentina','España','Francia'],
+        'Año': [2022]*5,
+        'G': [8,7,6,5,4]
+    })
+    goleadores = pd.DataFrame({
+        'Jugador': ['Messi','Mbappé','Giroud','Álvarez','Gakpo'],
+        'Equipo': ['Argentina','Francia','Francia','Argentina','Países Bajos'],
+        'Año': [2022]*5,
+        'G': [7,8,4,4,3]
+    })
+    return tipos_compactos(losequipos), tipos_compactos(goleadores)
+
+consultas = ConsultasMongo(conectar) if MODO_CONSULTA == "mongo" else None
+_candado_refresco = None
+
+def es_refrescador() -> bool:
+    global _candado_refresco
+    if _candado_refresco is None:
+        _candado_refresco = tomar_candado(SNAPSHOT_DIR)
+    return _candado_refresco is not None
+
+def sin_datos(snap: Instantanea) -> bool:
+    return not snap.años_equipos or not snap.años_goleadores
+
+def recargar(actual: Instantanea) -> Optional[Instantanea]:
+    nueva = _recargar(actual)
+    if nueva is not None and sin_datos(nueva):
+        # Nunca se publica una instantánea vacía: se sigue sirviendo la anterior
+        raise ValueError(f"la versión {nueva.version} no tiene Mundiales")
+    return nueva
+
+def _recargar(actual: Instantanea) -> Optional[Instantanea]:
+    if consultas is not None:
+        # En modo mongo solo se refrescan los metadatos de los controles
+        version = consultas.version()
+        if version == actual.version:
+            return None
+        return Instantanea(version, consultas.años("goles_por_equipo"),
+                           consultas.años("goleadores_mundiales"), consultas.max_goles(),
+                           historico=Historico(tipos_compactos(consultas.goles_jugador_año())))
+    if es_refrescador():
+        pendientes = gestor.tomar_pendientes()
+        if pendientes and None not in pendientes.values():
+            # Los change streams dijeron qué Mundiales cambiaron: solo esos se leen de MongoDB
+            cambios = cargar_cambios(conectar(), pendientes, MUNDIALES)
+            completas = {}
+        else:
+            losequipos, goleadores = datoss()
+            cambios = diferencia(actual, losequipos, goleadores)
+            completas = {"losequipos": losequipos, "goleadores": goleadores}
+        if cambios.vacio:
+            return None
+        logger.info(f"Mundiales con cambios: {cambios.resumen()}")
+        # Solo se recalculan los años cambiados; el resto de los agregados sale de la instantánea actual
+        nueva = aplicar_cambios(actual, cambios, **completas)
+        if sin_datos(nueva):
+            return nueva
+        try:
+            exportar_snapshot(SNAPSHOT_DIR, nueva.losequipos, nueva.goleadores, nueva.version)
+        except OSError as e:
+            logger.warning(f"No se pudo guardar el snapshot: {e}")
+            return nueva
+        # Se sirve desde el mmap del snapshot para compartir páginas con los demás workers
+        snapshot = cargar_snapshot(SNAPSHOT_DIR)
+        if snapshot is None:
+            return nueva
+        return replace(nueva, losequipos=snapshot[0], goleadores=snapshot[1])
+    if version_snapshot(SNAPSHOT_DIR) == actual.version:
+        return None
+    snapshot = cargar_snapshot(SNAPSHOT_DIR)
+    if snapshot is None:
+        return None
+    losequipos, goleadores, _ = snapshot
+    return aplicar_cambios(actual, diferencia(actual, losequipos, goleadores), losequipos, goleadores)
+
+def instantanea_inicial() -> Instantanea:
+    snapshot = cargar_snapshot(SNAPSHOT_DIR) if consultas is None else None
+    if snapshot is not None:
+        losequipos, goleadores, version = snapshot
+        inicial = instantanea_memoria(losequipos, goleadores, version)
+        if not sin_datos(inicial):
+            return inicial
+        logger.warning(f"El snapshot de {SNAPSHOT_DIR} está vacío; se arranca con los datos de respaldo")
+    return instantanea_memoria(*datos_respaldo())
+
+# El servidor arranca con el último snapshot (o los datos de respaldo); MongoDB se lee en segundo plano
+INTERVALO_REFRESCO = float(os.environ.get("INTERVALO_REFRESCO", "300"))
+ARRANQUE.marcar("imports")
+gestor = GestorDatos(instantanea_inicial(), recargar, INTERVALO_REFRESCO)
+ARRANQUE.marcar("instantanea")
+
+def iniciar_refresco():
+    # Los hilos no sobreviven a un fork: con varios workers se llama en cada uno después del fork
+    if REFRESCO_MONGO:
+        gestor.iniciar()
+        if os.environ.get("CAMBIOS_MONGO") == "1":
+            gestor.escuchar_cambios(conectar())
+
+def medir_serializacion(clave, etapa: str, segundos: float):
+    metricas.observar("dash_callback_etapa_segundos", segundos, callback=clave[0], etapa=etapa)
+
+def version_codigo() -> str:
+    # Huella de los .py del proyecto y de las versiones de dash y plotly: cambia con cada deploy
+    huella = hashlib.sha1()
+    for ruta in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*.py"))):
+        with open(ruta, "rb") as f:
+            huella.update(f.read())
+    for paquete in ("dash", "plotly"):
+        huella.update(importlib.metadata.version(paquete).encode("utf-8"))
+    return huella.hexdigest()[:16]
+
+# Con CACHE_FIGURAS_DIR la caché vive en disco y la comparten todos los workers
+if os.environ.get("CACHE_FIGURAS_DIR"):
+    cache_figuras = CacheFigurasDisco(os.environ["CACHE_FIGURAS_DIR"],
+                                      capacidad=int(os.environ.get("CACHE_FIGURAS_MAX", "1024")),
+                                      medir=medir_serializacion, version_codigo=version_codigo())
+else:
+    cache_figuras = CacheFiguras(capacidad=int(os.environ.get("CACHE_FIGURAS_MAX", "256")),
+                                 medir=medir_serializacion)
+
+@metricas.colector
+def estadisticas_cache_metricas(m: Metricas):
+    est = cache_figuras.estadisticas()
+    m.fijar("cache_figuras_aciertos_total", est["aciertos"], "Aciertos de la caché de figuras", "counter")
+    m.fijar("cache_figuras_fallos_total", est["fallos"], "Fallos de la caché de figuras", "counter")
+    m.fijar("cache_figuras_tasa_aciertos", est["tasa_aciertos"], "Proporción de aciertos de la caché de figuras")
+    m.fijar("cache_figuras_entradas", est["entradas"], "Entradas guardadas en la caché de figuras")
+
+try:
+    import flask_compress  # noqa: F401
+    COMPRIMIR = True
+except ImportError:
+    logger.info("flask-compress no está instalado; se comprime con gzip en after_request")
+    COMPRIMIR = False
 
+# assets/style.css y los .js de assets/ los incluye Dash solo, con huella ?m= de la fecha de modificación
 app = dash.Dash(
     __name__,
-    external_stylesheets=[dbc.themes.BOOTSTRAP, "/assets/style.css"]
+    external_stylesheets=[dbc.themes.BOOTSTRAP],
+    compress=COMPRIMIR
 )
+ARRANQUE.marcar("app")
+
+def imagen_animada(nombre: str, style: dict):
+    # Si optimizar_assets.py generó las variantes livianas del GIF, se sirve el video (o el WebP)
+    base = os.path.splitext(nombre)[0]
+    carpeta = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+    if os.path.exists(os.path.join(carpeta, base + ".mp4")):
+        return html.Video(src=app.get_asset_url(base + ".mp4"), autoPlay=True, loop=True, muted=True,
+                          controls=False, preload="metadata", style=style)
+    if os.path.exists(os.path.join(carpeta, base + ".webp")):
+        return html.Img(src=app.get_asset_url(base + ".webp"), style=style)
+    return html.Img(src=app.get_asset_url(nombre), style=style)
+
 def create_metric_card(title: str, value: str, icon: str, color: str = COLORS['primary']):
     return dbc.Card([
         dbc.CardBody([
@@ -75,6 +311,21 @@ def create_metric_card(title: str, value: str, icon: str, color: str = COLORS['p
         ])
     ], className="metric-card")
 
+def equipos_heatmap(snap: Instantanea) -> list:
+    # En modo mongo la lista completa no está en memoria; el zoom queda sin opciones
+    return [] if snap.agregados is None else snap.agregados.heatmap.equipos.tolist()
+
+def opciones_historico(snap: Instantanea) -> Tuple[list, list]:
+    # Países y las 200 mejores carreras; el dropdown filtra escribiendo
+    if snap.historico is None:
+        return [], []
+    return snap.historico.naciones.tolist(), snap.historico.etiquetas(200)
+
+def plantillas_goleadores(_=None) -> dict:
+    # Se manda una sola vez por página; el navegador solo agrega los datos de cada figura.
+    # Va por callback y no en el layout: leer pio.templates importa plotly, y el layout se arma al arrancar
+    return {"template": pio.templates[pio.templates.default].to_plotly_json()}
+
 def elheader(title: str, subtitle: str = None):
     return html.Div([
         html.H2(title, className="section-main-title"),
@@ -83,421 +334,648 @@ def elheader(title: str, subtitle: str = None):
     ], className="section-header")
 
 # — Layout Principal —
-app.layout = html.Div([
-
-    html.Div(
-        className="about-us-section",
-        style={
-            "backgroundColor": "#6D0C2E",
-            "padding": "60px 0"
-        },
-        children=[
-            html.H1(
-                "EstadistiGOL",
-                style={"color": "#FFFFFF", "textAlign": "center"}
-            ),
-            html.P(
-                "Estadísticas del mundial que marcaron en la historia",
-                style={"color": "#FFFFFF", "textAlign": "center"}
-            ),
-        ]
-    ),
-    html.Div(className="hero-section", children=[
-        html.Div(className="hero-overlay"),
-        html.Div(className="hero-container", children=[
-            html.Div(className="hero-content", children=[
-                html.H1("ESTADÍSTICAS  MUNDIAL", className="hero-title"),
-                html.P("Analisis de los datos referentes a los mundiales pasados", className="hero-subtitle"),
-                html.Div([
-                    html.Span("🏆", className="hero-emoji"),
-                    html.Span("⚽", className="hero-emoji"),
-                    html.Span("📊", className="hero-emoji"),
-                ], className="hero-emojis")
-            ])
-        ])
-    ]),
+# Es una función: se arma en la primera carga de página y no al importar, y los controles nacen
+# con los años y el máximo de goles de la instantánea vigente. Se reutiliza mientras no cambie la versión.
+_layout_actual: Tuple[Optional[str], Optional[html.Div]] = (None, None)
 
-    dbc.Container(fluid=True, className="description-section", children=[
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H3("📊 DASHBOARD INTERACTIVO DE ESTADÍSTICAS FIFA WORLD CUP 🏆",
-                                className="description-title"),
-                        html.Hr(className="description-divider"),
-                        html.P([
-                            "Este proyecto consta de ", html.Strong("2 dashboards"),
-                            " de análisis interactivo, desarrollado con ", html.Strong("Dash"),
-                            ", ", html.Strong("Plotly"), " y ", html.Strong("MongoDB"),
-                            ", que permite explorar de manera visual y dinámica las estadísticas históricas más relevantes de la Copa Mundial de la FIFA."
-                        ], className="description-text"),
-
-                        html.H4("🧠 FUNCIONALIDADES DESTACADAS:", className="description-subtitle"),
-                        html.Ul([
-                            html.Li("Análisis por año de las selecciones más goleadoras en cada Mundial."),
-                            html.Li(
-                                "Visualización de los máximos goleadores por torneo, con múltiples filtros y comparativas."),
-                            html.Li(
-                                "Gráficos dinámicos: barras, líneas, mapas de calor, treemaps, radar charts y más."),
-                            html.Li("Tablas detalladas para consulta de datos específicos."),
-                            html.Li("Sección de datos curiosos que resaltan momentos históricos únicos del torneo."),
-                            html.Li("Diseño moderno, responsivo y visualmente atractivo.")
-                        ], className="description-list"),
-
-                        html.H4("💾 FUENTE DE DATOS:", className="description-subtitle"),
-                        html.P([
-                            "Los datos son obtenidos desde una base de datos MongoDB con dos colecciones principales: ",
-                            html.Code("goles_por_equipo"), " y ", html.Code("goleadores_mundiales"), "."
-                        ], className="description-text"),
-
-                        html.H4("🎯 OBJETIVO:", className="description-subtitle"),
-                        html.P(
-                            "Ofrecer una herramienta educativa, informativa y entretenida para todos los fanáticos del fútbol.",
-                            className="description-text")
-                    ])
-                ], className="description-card")
-            ], md=12)
-        ])
-    ]),
+def construir_layout():
+    global _layout_actual
+    snap = gestor.actual
+    version, layout = _layout_actual
+    if version == snap.version:
+        return layout
+    with ARRANQUE.etapa("layout"):
+        layout = layout_de(snap)
+    _layout_actual = (snap.version, layout)
+    return layout
 
-dbc.Container(fluid=True, className="feature-section", children=[
-    dbc.Row([
-        dbc.Col(
-            html.Img(
-                src="C:/Users/mg_ma/PycharmProjects/pythonProject/templates/.venv/share/assets/messi_copa.jpg",
-                style={"width": "100%", "borderRadius": "8px"}
-            ),
-            md=6
-        ),
-        dbc.Col(
-            html.Div([
-                html.H3("Visión general del Campeonato"),
-                html.P(
-                    "Los dashboards sintetizan datos históricos de goles, equipos y estadísticas clave, "
-                    "facilitando la toma de decisiones y la comparación de rendimientos."
-                )
-            ], style={"padding": "20px"}),
-            md=6
-        )
-    ], align="center", style={"margin": "60px 0"}),
-    dbc.Row([
-        dbc.Col(
-            html.Div([
-                html.H3("Cobertura de Momentos Clave"),
+def layout_de(snap: Instantanea):
+    paises_historico, jugadores_historico = opciones_historico(snap)
+    return html.Div([
+        # Revisa periódicamente si el gestor de datos cambió de versión
+        dcc.Interval(id="intervalo-datos", interval=int(os.environ.get("INTERVALO_CONTROLES_MS", "15000"))),
+        dcc.Store(id="version-datos", data=snap.version),
+        dcc.Store(id="datos-goleadores-año"),
+        dcc.Store(id="plantillas-goleadores"),
+
+        html.Div(
+            className="about-us-section",
+            style={
+                "backgroundColor": "#6D0C2E",
+                "padding": "60px 0"
+            },
+            children=[
+                html.H1(
+                    "EstadistiGOL",
+                    style={"color": "#FFFFFF", "textAlign": "center"}
+                ),
                 html.P(
-                    "Con gráficos interactivos puedes seguir cada jugada importante y entender "
-                    "cómo influyen en el resultado global del torneo."
-                )
-            ], style={"padding": "20px"}),
-            md=6
+                    "Estadísticas del mundial que marcaron en la historia",
+                    style={"color": "#FFFFFF", "textAlign": "center"}
+                ),
+            ]
         ),
-        dbc.Col(
-            html.Img(
-                src="C:/Users/mg_ma/PycharmProjects/pythonProject/templates/.venv/share/assets/portada.jpg",
-                style={"width": "100%", "borderRadius": "8px"}
+        html.Div(className="hero-section", children=[
+            html.Div(className="hero-overlay"),
+            html.Div(className="hero-container", children=[
+                html.Div(className="hero-content", children=[
+                    html.H1("ESTADÍSTICAS  MUNDIAL", className="hero-title"),
+                    html.P("Analisis de los datos referentes a los mundiales pasados", className="hero-subtitle"),
+                    html.Div([
+                        html.Span("🏆", className="hero-emoji"),
+                        html.Span("⚽", className="hero-emoji"),
+                        html.Span("📊", className="hero-emoji"),
+                    ], className="hero-emojis")
+                ])
+            ])
+        ]),
+
+        dbc.Container(fluid=True, className="description-section", children=[
+            dbc.Row([
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardBody([
+                            html.H3("📊 DASHBOARD INTERACTIVO DE ESTADÍSTICAS FIFA WORLD CUP 🏆",
+                                    className="description-title"),
+                            html.Hr(className="description-divider"),
+                            html.P([
+                                "Este proyecto consta de ", html.Strong("2 dashboards"),
+                                " de análisis interactivo, desarrollado con ", html.Strong("Dash"),
+                                ", ", html.Strong("Plotly"), " y ", html.Strong("MongoDB"),
+                                ", que permite explorar de manera visual y dinámica las estadísticas históricas más relevantes de la Copa Mundial de la FIFA."
+                            ], className="description-text"),
+
+                            html.H4("🧠 FUNCIONALIDADES DESTACADAS:", className="description-subtitle"),
+                            html.Ul([
+                                html.Li("Análisis por año de las selecciones más goleadoras en cada Mundial."),
+                                html.Li(
+                                    "Visualización de los máximos goleadores por torneo, con múltiples filtros y comparativas."),
+                                html.Li(
+                                    "Gráficos dinámicos: barras, líneas, mapas de calor, treemaps, radar charts y más."),
+                                html.Li("Tablas detalladas para consulta de datos específicos."),
+                                html.Li("Sección de datos curiosos que resaltan momentos históricos únicos del torneo."),
+                                html.Li("Diseño moderno, responsivo y visualmente atractivo.")
+                            ], className="description-list"),
+
+                            html.H4("💾 FUENTE DE DATOS:", className="description-subtitle"),
+                            html.P([
+                                "Los datos son obtenidos desde una base de datos MongoDB con dos colecciones principales: ",
+                                html.Code("goles_por_equipo"), " y ", html.Code("goleadores_mundiales"), "."
+                            ], className="description-text"),
+
+                            html.H4("🎯 OBJETIVO:", className="description-subtitle"),
+                            html.P(
+                                "Ofrecer una herramienta educativa, informativa y entretenida para todos los fanáticos del fútbol.",
+                                className="description-text")
+                        ])
+                    ], className="description-card")
+                ], md=12)
+            ])
+        ]),
+
+    dbc.Container(fluid=True, className="feature-section", children=[
+        dbc.Row([
+            dbc.Col(
+                html.Img(
+                    src=app.get_asset_url("messi_copa.jpg"),
+                    style={"width": "100%", "borderRadius": "8px"}
+                ),
+                md=6
             ),
-            md=6
-        )
-    ], align="center", style={"margin": "60px 0"}),
-]),
-
-
-    # === MÉTRICAS GENERALES ===
-    dbc.Container(fluid=True, className="metrics-section", children=[
-        dbc.Row(className="metrics-row", children=[
-            dbc.Col(create_metric_card("Mundiales Analizados", "21", "trophy"), md=3),
-            dbc.Col(create_metric_card("Países Participantes", "200+", "flag", COLORS['info']), md=3),
-            dbc.Col(create_metric_card("Goles Registrados", "2,500+", "futbol", COLORS['success']), md=3),
-            dbc.Col(create_metric_card("Leyendas del Fútbol", "1,000+", "star", COLORS['warning']), md=3),
-        ])
+            dbc.Col(
+                html.Div([
+                    html.H3("Visión general del Campeonato"),
+                    html.P(
+                        "Los dashboards sintetizan datos históricos de goles, equipos y estadísticas clave, "
+                        "facilitando la toma de decisiones y la comparación de rendimientos."
+                    )
+                ], style={"padding": "20px"}),
+                md=6
+            )
+        ], align="center", style={"margin": "60px 0"}),
+        dbc.Row([
+            dbc.Col(
+                html.Div([
+                    html.H3("Cobertura de Momentos Clave"),
+                    html.P(
+                        "Con gráficos interactivos puedes seguir cada jugada importante y entender "
+                        "cómo influyen en el resultado global del torneo."
+                    )
+                ], style={"padding": "20px"}),
+                md=6
+            ),
+            dbc.Col(
+                html.Img(
+                    src=app.get_asset_url("portada.jpg"),
+                    style={"width": "100%", "borderRadius": "8px"}
+                ),
+                md=6
+            )
+        ], align="center", style={"margin": "60px 0"}),
     ]),
 
-    dbc.Container(fluid=True, className="analysis-section", children=[
-        elheader(
-            "🏆 ANÁLISIS DE EQUIPOS GOLEADORES",
-            "Descubre qué selecciones han dominado en cada Mundial"
-        ),
-        # Controles
-        dbc.Row(className="controls-row", children=[
-            dbc.Col(md=4, children=[
-                html.Div(className="control-container", children=[
-                    html.Label("📅 Selecciona el Mundial:", className="control-label"),
-                    dcc.Dropdown(
-                        id="anio-equipos",
-                        options=[{"label": f"Mundial {a}", "value": a} for a in sorted(losequipos["Año"].unique())],
-                        value=max(losequipos["Año"].unique()),
-                        clearable=False, className="custom-dropdown"
-                    )
+
+        # === MÉTRICAS GENERALES ===
+        dbc.Container(fluid=True, className="metrics-section", children=[
+            dbc.Row(className="metrics-row", children=[
+                dbc.Col(create_metric_card("Mundiales Analizados", "21", "trophy"), md=3),
+                dbc.Col(create_metric_card("Países Participantes", "200+", "flag", COLORS['info']), md=3),
+                dbc.Col(create_metric_card("Goles Registrados", "2,500+", "futbol", COLORS['success']), md=3),
+                dbc.Col(create_metric_card("Leyendas del Fútbol", "1,000+", "star", COLORS['warning']), md=3),
+            ])
+        ]),
+
+        dbc.Container(fluid=True, className="analysis-section", children=[
+            elheader(
+                "🏆 ANÁLISIS DE EQUIPOS GOLEADORES",
+                "Descubre qué selecciones han dominado en cada Mundial"
+            ),
+            # Controles
+            dbc.Row(className="controls-row", children=[
+                dbc.Col(md=4, children=[
+                    html.Div(className="control-container", children=[
+                        html.Label("📅 Selecciona el Mundial:", className="control-label"),
+                        dcc.Dropdown(
+                            id="anio-equipos",
+                            options=[{"label": f"Mundial {a}", "value": a} for a in snap.años_equipos],
+                            value=max(snap.años_equipos, default=None),
+                            clearable=False, className="custom-dropdown"
+                        )
+                    ])
+                ]),
+                dbc.Col(md=4, children=[
+                    html.Div(className="control-container", children=[
+                        html.Label("📊 Tipo de Vista:", className="control-label"),
+                        dcc.RadioItems(
+                            id="vista-equipos",
+                            options=[
+                                {"label": "Top 10", "value": "top10"},
+                                {"label": "Todos", "value": "todos"}
+                            ],
+                            value="top10", inline=True, className="custom-radio"
+                        )
+                    ])
                 ])
             ]),
-            dbc.Col(md=4, children=[
-                html.Div(className="control-container", children=[
-                    html.Label("📊 Tipo de Vista:", className="control-label"),
-                    dcc.RadioItems(
-                        id="vista-equipos",
-                        options=[
-                            {"label": "Top 10", "value": "top10"},
-                            {"label": "Todos", "value": "todos"}
-                        ],
-                        value="top10", inline=True, className="custom-radio"
-                    )
-                ])
+            # 4 Gráficas
+            dbc.Row(className="dashboard-row", children=[
+                dbc.Col(dbc.Card([dbc.CardHeader("Ranking de Goleadores"), dbc.CardBody(dcc.Graph(id="bar-equipos"))],
+                                className="dashboard-card"), md=6),
+                dbc.Col(dbc.Card([dbc.CardHeader("Distribución de Goles"), dbc.CardBody(dcc.Graph(id="pie-equipos"))],
+                                className="dashboard-card"), md=6),
+            ]),
+            dbc.Row(className="dashboard-row", children=[
+                dbc.Col(dbc.Card([dbc.CardHeader("Evolución Histórica"), dbc.CardBody([
+                    dbc.Row([
+                        dbc.Col(dcc.Dropdown(
+                            id="orden-heatmap",
+                            options=[{"label": "Más goleadores", "value": "total"},
+                                     {"label": "Agrupados por mejor Mundial", "value": "agrupado"},
+                                     {"label": "Alfabético", "value": "alfabetico"}],
+                            value="total", clearable=False, className="custom-dropdown"), md=5),
+                        dbc.Col(dcc.Dropdown(
+                            id="top-heatmap",
+                            options=[{"label": f"Top {n}", "value": n} for n in (15, 25, 50)] + [{"label": "Todos", "value": 0}],
+                            value=25, clearable=False, className="custom-dropdown"), md=3),
+                        dbc.Col(dcc.Dropdown(
+                            id="equipos-heatmap", multi=True, placeholder="Acercar a equipos...",
+                            options=equipos_heatmap(snap), className="custom-dropdown"), md=4),
+                    ]),
+                    dcc.Graph(id="heatmap-equipos")
+                ])], className="dashboard-card"), md=6),
+                dbc.Col(dbc.Card([dbc.CardHeader("Tendencia Temporal"), dbc.CardBody(dcc.Graph(id="line-equipos"))],
+                                className="dashboard-card"), md=6),
+            ]),
+            # Tabla
+            dbc.Row(className="table-row", children=[
+                dbc.Col(dbc.Card([
+                    dbc.CardHeader("Datos Detallados"),
+                    dbc.CardBody([
+                        dash_table.DataTable(
+                            id="tabla-equipos",
+                            columns=[{"name": "Equipo", "id": "Equipo"},
+                                     {"name": "Año", "id": "Año", "type": "numeric"},
+                                     {"name": "Goles", "id": "G", "type": "numeric"}],
+                            # Paginado, orden y filtro en el servidor: solo viaja la página visible
+                            data=[], page_size=10, page_current=0, page_action="custom",
+                            sort_action="custom", sort_mode="multi", sort_by=[],
+                            filter_action="custom", filter_query="",
+                            style_table={"overflowX": "auto"},
+                            style_header={"backgroundColor": COLORS['primary'], "color": "white", "textAlign": "center"},
+                            style_cell={"padding": "12px", "textAlign": "center"},
+                            style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': COLORS['secondary']}]
+                        )
+                    ])
+                ], className="table-card"), md=12)
             ])
         ]),
-        # 4 Gráficas
-        dbc.Row(className="dashboard-row", children=[
-            dbc.Col(dbc.Card([dbc.CardHeader("Ranking de Goleadores"), dbc.CardBody(dcc.Graph(id="bar-equipos"))],
-                            className="dashboard-card"), md=6),
-            dbc.Col(dbc.Card([dbc.CardHeader("Distribución de Goles"), dbc.CardBody(dcc.Graph(id="pie-equipos"))],
-                            className="dashboard-card"), md=6),
-        ]),
-        dbc.Row(className="dashboard-row", children=[
-            dbc.Col(dbc.Card([dbc.CardHeader("Evolución Histórica"), dbc.CardBody(dcc.Graph(id="heatmap-equipos"))],
-                            className="dashboard-card"), md=6),
-            dbc.Col(dbc.Card([dbc.CardHeader("Tendencia Temporal"), dbc.CardBody(dcc.Graph(id="line-equipos"))],
-                            className="dashboard-card"), md=6),
-        ]),
-        # Tabla
-        dbc.Row(className="table-row", children=[
-            dbc.Col(dbc.Card([
-                dbc.CardHeader("Datos Detallados"),
-                dbc.CardBody([
-                    dash_table.DataTable(
-                        id="tabla-equipos",
-                        columns=[{"name": "Equipo", "id": "Equipo"},
-                                 {"name": "Año", "id": "Año"},
-                                 {"name": "Goles", "id": "G"}],
-                        data=[], page_size=10,
-                        style_table={"overflowX": "auto"},
-                        style_header={"backgroundColor": COLORS['primary'], "color": "white", "textAlign": "center"},
-                        style_cell={"padding": "12px", "textAlign": "center"},
-                        style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': COLORS['secondary']}]
-                    )
-                ])
-            ], className="table-card"), md=12)
-        ])
-    ]),
 
-    html.Hr(className="section-separator"),
+        html.Hr(className="section-separator"),
 
-    dbc.Container(fluid=True, className="analysis-section", children=[
-        elheader(
-            "⚽ ANÁLISIS DE GOLEADORES HISTÓRICOS",
-            "Los máximos artilleros que han marcado la historia del fútbol"
-        ),
-        # Controles
-        dbc.Row(className="controls-row", children=[
-            dbc.Col(md=4, children=[
-                html.Div(className="control-container", children=[
-                    html.Label("📅 Selecciona el Mundial:", className="control-label"),
-                    dcc.Dropdown(
-                        id="anio-goleadores",
-                        options=[{"label": f"Mundial {a}", "value": a} for a in sorted(goleadores["Año"].unique())],
-                        value=max(goleadores["Año"].unique()),
-                        clearable=False, className="custom-dropdown"
-                    )
+        dbc.Container(id="seccion-goleadores", fluid=True, className="analysis-section", children=[
+            # assets/carga_diferida.js lo pulsa cuando la sección se hace visible
+            html.Button(id="activar-goleadores", n_clicks=0, style={"display": "none"}),
+            elheader(
+                "⚽ ANÁLISIS DE GOLEADORES HISTÓRICOS",
+                "Los máximos artilleros que han marcado la historia del fútbol"
+            ),
+            # Controles
+            dbc.Row(className="controls-row", children=[
+                dbc.Col(md=4, children=[
+                    html.Div(className="control-container", children=[
+                        html.Label("📅 Selecciona el Mundial:", className="control-label"),
+                        dcc.Dropdown(
+                            id="anio-goleadores",
+                            options=[{"label": f"Mundial {a}", "value": a} for a in snap.años_goleadores],
+                            value=max(snap.años_goleadores, default=None),
+                            clearable=False, className="custom-dropdown"
+                        )
+                    ])
+                ]),
+                dbc.Col(md=8, children=[
+                    html.Div(className="control-container", children=[
+                        html.Label("🎯 Filtro por Goles:", className="control-label"),
+                        dcc.RangeSlider(
+                            id="goles-range",
+                            min=0, max=snap.max_goles, step=1,
+                            marks={i: str(i) for i in range(0, snap.max_goles+1, 2)},
+                            value=[0, snap.max_goles],
+                            className="custom-slider"
+                        )
+                    ])
                 ])
             ]),
-            dbc.Col(md=8, children=[
-                html.Div(className="control-container", children=[
-                    html.Label("🎯 Filtro por Goles:", className="control-label"),
-                    dcc.RangeSlider(
-                        id="goles-range",
-                        min=0, max=int(goleadores["G"].max()), step=1,
-                        marks={i: str(i) for i in range(0, int(goleadores["G"].max())+1, 2)},
-                        value=[0, int(goleadores["G"].max())],
-                        className="custom-slider"
-                    )
+            # 4 Gráficas
+            dbc.Row(className="dashboard-row", children=[
+                dbc.Col(dbc.Card([dbc.CardHeader("Top Goleadores"), dbc.CardBody(dcc.Graph(id="bar-goleadores"))],
+                                className="dashboard-card"), md=6),
+                dbc.Col(dbc.Card([dbc.CardHeader("Goles por País"), dbc.CardBody(dcc.Graph(id="treemap-goleadores"))],
+                                className="dashboard-card"), md=6),
+            ]),
+            dbc.Row(className="dashboard-row", children=[
+                dbc.Col(dbc.Card([dbc.CardHeader("Comparativa Top 5"), dbc.CardBody(dcc.Graph(id="radar-goleadores"))],
+                                className="dashboard-card"), md=6),
+                dbc.Col(dbc.Card([dbc.CardHeader("Rendimiento Individual"), dbc.CardBody(dcc.Graph(id="scatter-goleadores"))],
+                                className="dashboard-card"), md=6),
+            ]),
+            # Tabla
+            dbc.Row(className="table-row", children=[
+                dbc.Col(dbc.Card([
+                    dbc.CardHeader("Ranking Completo"),
+                    dbc.CardBody([
+                        dash_table.DataTable(
+                            id="tabla-goleadores",
+                            columns=[{"name": "Jugador", "id": "Jugador"},
+                                     {"name": "Equipo", "id": "Equipo"},
+                                     {"name": "Goles", "id": "G"},
+                                     {"name": "Año", "id": "Año"}],
+                            data=[], page_size=12,
+                            style_table={"overflowX": "auto"},
+                            style_header={"backgroundColor": COLORS['primary'], "color": "white", "textAlign": "center"},
+                            style_cell={"padding": "12px", "textAlign": "center"},
+                            style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': COLORS['secondary']}]
+                        )
+                    ])
+                ], className="table-card"), md=12)
+            ]),
+            # Histórico: acumulados de todos los Mundiales, precalculados en historico.py
+            elheader(
+                "📜 HISTÓRICO DE TODOS LOS MUNDIALES",
+                "Carreras completas y la evolución de cada selección torneo a torneo"
+            ),
+            dbc.Row(className="controls-row", children=[
+                dbc.Col(md=6, children=[
+                    html.Div(className="control-container", children=[
+                        html.Label("⭐ Jugadores:", className="control-label"),
+                        dcc.Dropdown(
+                            id="jugadores-historico", multi=True,
+                            options=jugadores_historico, value=jugadores_historico[:5],
+                            className="custom-dropdown"
+                        )
+                    ])
+                ]),
+                dbc.Col(md=6, children=[
+                    html.Div(className="control-container", children=[
+                        html.Label("🌎 Países:", className="control-label"),
+                        dcc.Dropdown(
+                            id="paises-historico", multi=True,
+                            options=paises_historico, value=paises_historico[:6],
+                            className="custom-dropdown"
+                        )
+                    ])
                 ])
+            ]),
+            dbc.Row(className="dashboard-row", children=[
+                dbc.Col(dbc.Card([dbc.CardHeader("Máximos Goleadores Históricos"), dbc.CardBody(dcc.Graph(id="bar-historico"))],
+                                className="dashboard-card"), md=6),
+                dbc.Col(dbc.Card([dbc.CardHeader("Trayectoria por Mundial"), dbc.CardBody(dcc.Graph(id="trayectoria-historico"))],
+                                className="dashboard-card"), md=6),
+            ]),
+            dbc.Row(className="dashboard-row", children=[
+                dbc.Col(dbc.Card([dbc.CardHeader("Goles Acumulados por País"), dbc.CardBody(dcc.Graph(id="acumulado-historico"))],
+                                className="dashboard-card"), md=6),
+                dbc.Col(dbc.Card([dbc.CardHeader("Ranking Histórico por País"), dbc.CardBody(dcc.Graph(id="ranking-historico"))],
+                                className="dashboard-card"), md=6),
             ])
         ]),
-        # 4 Gráficas
-        dbc.Row(className="dashboard-row", children=[
-            dbc.Col(dbc.Card([dbc.CardHeader("Top Goleadores"), dbc.CardBody(dcc.Graph(id="bar-goleadores"))],
-                            className="dashboard-card"), md=6),
-            dbc.Col(dbc.Card([dbc.CardHeader("Goles por País"), dbc.CardBody(dcc.Graph(id="treemap-goleadores"))],
-                            className="dashboard-card"), md=6),
-        ]),
-        dbc.Row(className="dashboard-row", children=[
-            dbc.Col(dbc.Card([dbc.CardHeader("Comparativa Top 5"), dbc.CardBody(dcc.Graph(id="radar-goleadores"))],
-                            className="dashboard-card"), md=6),
-            dbc.Col(dbc.Card([dbc.CardHeader("Rendimiento Individual"), dbc.CardBody(dcc.Graph(id="scatter-goleadores"))],
-                            className="dashboard-card"), md=6),
-        ]),
-        # Tabla
-        dbc.Row(className="table-row", children=[
-            dbc.Col(dbc.Card([
-                dbc.CardHeader("Ranking Completo"),
-                dbc.CardBody([
-                    dash_table.DataTable(
-                        id="tabla-goleadores",
-                        columns=[{"name": "Jugador", "id": "Jugador"},
-                                 {"name": "Equipo", "id": "Equipo"},
-                                 {"name": "Goles", "id": "G"},
-                                 {"name": "Año", "id": "Año"}],
-                        data=[], page_size=12,
-                        style_table={"overflowX": "auto"},
-                        style_header={"backgroundColor": COLORS['primary'], "color": "white", "textAlign": "center"},
-                        style_cell={"padding": "12px", "textAlign": "center"},
-                        style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': COLORS['secondary']}]
-                    )
-                ])
-            ], className="table-card"), md=12)
-        ])
-    ]),
 
-    html.Hr(className="section-separator"),
-dbc.Container(fluid=True, className="feature-section", children=[
-    dbc.Row([
-        dbc.Col(
-            html.Img(
-                src="C:/Users/mg_ma/PycharmProjects/pythonProject/templates/.venv/share/assets/portero_pateando_pelota.jpg",
-                style={"width": "100%", "borderRadius": "8px"}
+        html.Hr(className="section-separator"),
+    dbc.Container(fluid=True, className="feature-section", children=[
+        dbc.Row([
+            dbc.Col(
+                html.Img(
+                    src=app.get_asset_url("portero_pateando_pelota.jpg"),
+                    style={"width": "100%", "borderRadius": "8px"}
+                ),
+                md=6
             ),
-            md=6
-        ),
-        dbc.Col(
-            html.Div([
-                html.H3("Análisis de Rendimiento Individual"),
-                html.P(
-                    "El desglose por jugador permite identificar fortalezas y áreas de mejora, "
-                    "comparando estadísticas de pases, tiros y atajadas."
-                )
-            ], style={"padding": "20px"}),
-            md=6
-        )
-    ], align="center", style={"margin": "60px 0"}),
-    dbc.Row([
-        dbc.Col(
-            html.Div([
-                html.H3("Perspectiva Estratégica"),
-                html.P(
-                    "Los dashboards convierten datos detallados en información accionable, permitiendo identificar rápidamente tendencias y oportunidades para optimizar el rendimiento."
-                )
-            ], style={"padding": "20px"}),
-            md=6
-        ),
-        dbc.Col(
-            html.Img(
-                src="abrazo_brazil.gif",
-                style={"width": "100%", "borderRadius": "8px"}
+            dbc.Col(
+                html.Div([
+                    html.H3("Análisis de Rendimiento Individual"),
+                    html.P(
+                        "El desglose por jugador permite identificar fortalezas y áreas de mejora, "
+                        "comparando estadísticas de pases, tiros y atajadas."
+                    )
+                ], style={"padding": "20px"}),
+                md=6
+            )
+        ], align="center", style={"margin": "60px 0"}),
+        dbc.Row([
+            dbc.Col(
+                html.Div([
+                    html.H3("Perspectiva Estratégica"),
+                    html.P(
+                        "Los dashboards convierten datos detallados en información accionable, permitiendo identificar rápidamente tendencias y oportunidades para optimizar el rendimiento."
+                    )
+                ], style={"padding": "20px"}),
+                md=6
             ),
-            md=6
-        )
-    ], align="center", style={"margin": "60px 0"})
-
-]),
-    dbc.Container(fluid=True, className="facts-section", children=[
-        elheader(
-            "🎯 DATOS CURIOSOS DEL MUNDIAL",
-            "Los momentos más increíbles de la historia"
-        ),
-        dbc.Row(className="facts-row", children=[
-            dbc.Col(dbc.Card(className="fact-card-modern", children=[
-                dbc.CardBody(html.Div(className="fact-content", children=[
-                    html.I(className="fas fa-rocket fa-3x", style={'color': COLORS['primary']}),
-                    html.H4("Primer Gol Histórico", className="fact-title"),
-                    html.P("Lucien Laurent (Francia) anotó el primer gol en Uruguay 1930 vs México.", className="fact-text")
-                ]))
-            ]), md=4),
-            dbc.Col(dbc.Card(className="fact-card-modern", children=[
-                dbc.CardBody(html.Div(className="fact-content", children=[
-                    html.I(className="fas fa-fire fa-3x", style={'color': COLORS['warning']}),
-                    html.H4("Mayor Goleada", className="fact-title"),
-                    html.P("Hungría 10–1 El Salvador (España 1982) la mayor goleada registrada.", className="fact-text")
-                ]))
-            ]), md=4),
-            dbc.Col(dbc.Card(className="fact-card-modern", children=[
-                dbc.CardBody(html.Div(className="fact-content", children=[
-                    html.I(className="fas fa-bolt fa-3x", style={'color': COLORS['info']}),
-                    html.H4("Gol más Rápido", className="fact-title"),
-                    html.P("Bryan Robson anotó a los 27s contra Francia en España 1982.", className="fact-text")
-                ]))
-            ]), md=4),
-        ]),
-        dbc.Row(className="facts-row", children=[
-            dbc.Col(dbc.Card(className="fact-card-modern", children=[
-                dbc.CardBody(html.Div(className="fact-content", children=[
-                    html.I(className="fas fa-crown fa-3x", style={'color': COLORS['success']}),
-                    html.H4("El Rey Pelé", className="fact-title"),
-                    html.P("Pelé es el único tricampeón: 1958, 1962 y 1970.", className="fact-text")
-                ]))
-            ]), md=6),
-            dbc.Col(dbc.Card(className="fact-card-modern", children=[
-                dbc.CardBody(html.Div(className="fact-content", children=[
-                    html.I(className="fas fa-trophy fa-3x", style={'color': COLORS['primary']}),
-                    html.H4("Campeones Históricos", className="fact-title"),
-                    html.P("Brasil (5), Alemania (4), Italia (4), Argentina (3), Uruguay (2)…", className="fact-text")
-                ]))
-            ]), md=6),
-        ])
+            dbc.Col(
+                imagen_animada("abrazo_brazil.gif", {"width": "100%", "borderRadius": "8px"}),
+                md=6
+            )
+        ], align="center", style={"margin": "60px 0"})
+
     ]),
+        dbc.Container(fluid=True, className="facts-section", children=[
+            elheader(
+                "🎯 DATOS CURIOSOS DEL MUNDIAL",
+                "Los momentos más increíbles de la historia"
+            ),
+            dbc.Row(className="facts-row", children=[
+                dbc.Col(dbc.Card(className="fact-card-modern", children=[
+                    dbc.CardBody(html.Div(className="fact-content", children=[
+                        html.I(className="fas fa-rocket fa-3x", style={'color': COLORS['primary']}),
+                        html.H4("Primer Gol Histórico", className="fact-title"),
+                        html.P("Lucien Laurent (Francia) anotó el primer gol en Uruguay 1930 vs México.", className="fact-text")
+                    ]))
+                ]), md=4),
+                dbc.Col(dbc.Card(className="fact-card-modern", children=[
+                    dbc.CardBody(html.Div(className="fact-content", children=[
+                        html.I(className="fas fa-fire fa-3x", style={'color': COLORS['warning']}),
+                        html.H4("Mayor Goleada", className="fact-title"),
+                        html.P("Hungría 10–1 El Salvador (España 1982) la mayor goleada registrada.", className="fact-text")
+                    ]))
+                ]), md=4),
+                dbc.Col(dbc.Card(className="fact-card-modern", children=[
+                    dbc.CardBody(html.Div(className="fact-content", children=[
+                        html.I(className="fas fa-bolt fa-3x", style={'color': COLORS['info']}),
+                        html.H4("Gol más Rápido", className="fact-title"),
+                        html.P("Bryan Robson anotó a los 27s contra Francia en España 1982.", className="fact-text")
+                    ]))
+                ]), md=4),
+            ]),
+            dbc.Row(className="facts-row", children=[
+                dbc.Col(dbc.Card(className="fact-card-modern", children=[
+                    dbc.CardBody(html.Div(className="fact-content", children=[
+                        html.I(className="fas fa-crown fa-3x", style={'color': COLORS['success']}),
+                        html.H4("El Rey Pelé", className="fact-title"),
+                        html.P("Pelé es el único tricampeón: 1958, 1962 y 1970.", className="fact-text")
+                    ]))
+                ]), md=6),
+                dbc.Col(dbc.Card(className="fact-card-modern", children=[
+                    dbc.CardBody(html.Div(className="fact-content", children=[
+                        html.I(className="fas fa-trophy fa-3x", style={'color': COLORS['primary']}),
+                        html.H4("Campeones Históricos", className="fact-title"),
+                        html.P("Brasil (5), Alemania (4), Italia (4), Argentina (3), Uruguay (2)…", className="fact-text")
+                    ]))
+                ]), md=6),
+            ])
+        ]),
 
-    html.Footer(className="footer", children=[
-        html.Div(className="footer-content", children=[
-            html.P("Marla Macias Gonzalez 2025 ", className="footer-text")
+        html.Footer(className="footer", children=[
+            html.Div(className="footer-content", children=[
+                html.P("Marla Macias Gonzalez 2025 ", className="footer-text")
+            ])
         ])
     ])
-])
+
+# Dash valida los callbacks contra este layout en vez de llamar a construir_layout al asignarlo;
+# se arma una sola vez al arrancar y queda como el layout de la versión vigente
+app.validation_layout = construir_layout()
+app.layout = construir_layout
+
+@app.callback(
+    [Output("anio-equipos", "options"),
+     Output("anio-equipos", "value"),
+     Output("anio-goleadores", "options"),
+     Output("anio-goleadores", "value"),
+     Output("goles-range", "max"),
+     Output("goles-range", "marks"),
+     Output("goles-range", "value"),
+     Output("equipos-heatmap", "options"),
+     Output("paises-historico", "options"),
+     Output("jugadores-historico", "options"),
+     Output("version-datos", "data")],
+    [Input("intervalo-datos", "n_intervals")],
+    [State("version-datos", "data"), State("anio-equipos", "value"),
+     State("anio-goleadores", "value"), State("goles-range", "value"), State("goles-range", "max")]
+)
+def actualizar_controles(_, version: str, año_eq: int, año_gol: int, rng: list, max_anterior: int):
+    snap = gestor.actual
+    if version == snap.version:
+        raise PreventUpdate
+    if año_eq not in snap.años_equipos:
+        año_eq = max(snap.años_equipos, default=None)
+    if año_gol not in snap.años_goleadores:
+        año_gol = max(snap.años_goleadores, default=None)
+    # Si el filtro llegaba al tope anterior, se extiende al nuevo máximo
+    hi = snap.max_goles if rng[1] >= max_anterior else min(rng[1], snap.max_goles)
+    lo = min(rng[0], hi)
+    return ([{"label": f"Mundial {a}", "value": a} for a in snap.años_equipos], año_eq,
+            [{"label": f"Mundial {a}", "value": a} for a in snap.años_goleadores], año_gol,
+            snap.max_goles, {i: str(i) for i in range(0, snap.max_goles+1, 2)}, [lo, hi],
+            equipos_heatmap(snap), *opciones_historico(snap), snap.version)
 
 @app.callback(
     [Output("bar-equipos", "figure"),
      Output("pie-equipos", "figure"),
-     Output("heatmap-equipos", "figure"),
-     Output("line-equipos", "figure"),
-     Output("tabla-equipos", "data")],
+     Output("line-equipos", "figure")],
     [Input("anio-equipos", "value"), Input("vista-equipos", "value")]
 )
 def actualizar_equipos(año: int, vista: str):
-    df_año = losequipos[losequipos["Año"] == año].sort_values("G", ascending=False)
-    df_mostrar = df_año.head(10) if vista == "top10" else df_año
+    # Sin Mundiales el dropdown queda en None: no hay nada que graficar
+    if año is None:
+        raise PreventUpdate
+    año = int(año)
+    vista = "top10" if vista == "top10" else "todos"
+    # Una sola lectura de la instantánea por request, aunque el gestor la cambie a mitad
+    snap = gestor.actual
+    clave = ("equipos", snap.version, año, vista)
+    with medir_callback("equipos", año, vista):
+        return cache_figuras.obtener(clave, lambda: figuras_equipos(snap, año, vista))
+
+def equipos_vista(snap: Instantanea, año: int, vista: str) -> pd.DataFrame:
+    df_año = consultas.equipos_año(año) if snap.agregados is None else snap.agregados.equipos_año(año)
+    return df_año.head(10) if vista == "top10" else df_año
 
-    fig_bar = px.bar(df_mostrar, x="Equipo", y="G", title=f"Goles por Equipo - Mundial {año}",
-                     color_continuous_scale=[COLORS['light_red'], COLORS['primary']], text="G")
-    fig_bar.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
-                          font_color=COLORS['dark_gray'])
+def figuras_equipos(snap: Instantanea, año: int, vista: str):
+    t = time.perf_counter()
+    totales_año = consultas.totales_año() if snap.agregados is None else snap.agregados.totales_año
+    df_mostrar = equipos_vista(snap, año, vista)
+    t = medir_etapa("equipos", "datos", t)
+
+    fig_bar = px.bar(df_mostrar, x="Equipo", y="G", title=f"Goles por Equipo - Mundial {año}", text="G")
     fig_bar.update_traces(textposition='outside')
 
     fig_pie = px.pie(df_mostrar.head(8), names="Equipo", values="G", title="Distribución de Goles")
-    fig_pie.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
-                          font_color=COLORS['dark_gray'])
-
-    pivot = losequipos.pivot_table(index="Equipo", columns="Año", values="G", aggfunc="sum", fill_value=0)
-    fig_heat = px.imshow(pivot, title="Evolución Histórica de Goles")
-    fig_heat.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
-                           font_color=COLORS['dark_gray'])
 
-    df_temp = losequipos.groupby("Año")["G"].sum().reset_index()
-    fig_line = px.line(df_temp, x="Año", y="G", title="Tendencia Total de Goles", markers=True)
+    fig_line = px.line(totales_año, x="Año", y="G", title="Tendencia Total de Goles", markers=True,
+                       render_mode="auto")
     fig_line.update_traces(line_color=COLORS['primary'], marker_color=COLORS['primary'])
-    fig_line.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
-                            font_color=COLORS['dark_gray'])
 
-    return fig_bar, fig_pie, fig_heat, fig_line, df_mostrar.to_dict("records")
+    medir_etapa("equipos", "figuras", t)
+    return fig_bar, fig_pie, fig_line
+
+@app.callback(
+    Output("heatmap-equipos", "figure"),
+    [Input("orden-heatmap", "value"), Input("top-heatmap", "value"), Input("equipos-heatmap", "value")]
+)
+def actualizar_heatmap(orden: str, top: int, equipos: list):
+    top = int(top or 0)
+    equipos = tuple(sorted(equipos or ()))
+    snap = gestor.actual
+    clave = ("heatmap", snap.version, orden, top, equipos)
+    with medir_callback("heatmap", orden, top, len(equipos)):
+        return cache_figuras.obtener(clave, lambda: figura_heatmap(snap, orden, top, equipos))
+
+def figura_heatmap(snap: Instantanea, orden: str, top: int, equipos: tuple):
+    t = time.perf_counter()
+    heatmap = MatrizHeatmap(consultas.pivot()) if snap.agregados is None else snap.agregados.heatmap
+    z, años, filas = heatmap.seleccionar(orden, top, equipos)
+    t = medir_etapa("heatmap", "datos", t)
+    # Arreglos numpy enteros: plotly los manda como typed arrays en vez de listas de números
+    fig_heat = go.Figure(go.Heatmap(z=z, x=años.astype(str), y=filas, coloraxis="coloraxis",
+                                    hovertemplate="%{y} %{x}: %{z} goles<extra></extra>"))
+    fig_heat.update_layout(title="Evolución Histórica de Goles", yaxis_autorange="reversed",
+                           height=max(450, 16 * len(filas) + 150))
+    medir_etapa("heatmap", "figuras", t)
+    return fig_heat
+
+# Operadores que genera filter_query de la DataTable -> nombre canónico
+OPERADORES_FILTRO = {"ge": "ge", ">=": "ge", "le": "le", "<=": "le", "lt": "lt", "<": "lt", "gt": "gt", ">": "gt",
+                     "ne": "ne", "!=": "ne", "eq": "eq", "=": "eq", "contains": "contains",
+                     "datestartswith": "datestartswith"}
+# "{columna} operador valor": el operador es la palabra justo después de la columna, nunca parte del valor
+PATRON_FILTRO = re.compile(r"^\{(.+?)\}\s+(\S+)\s+(.*)$")
+
+def partir_filtro(parte: str):
+    # ValueError si la condición no tiene la forma esperada o el operador no existe
+    coincidencia = PATRON_FILTRO.match(parte.strip())
+    if coincidencia is None or coincidencia.group(2) not in OPERADORES_FILTRO:
+        raise ValueError(f"filtro inválido: {parte!r}")
+    nombre, operador, valor = coincidencia.groups()
+    operador, valor = OPERADORES_FILTRO[operador], valor.strip()
+    if len(valor) > 1 and valor[0] == valor[-1] and valor[0] in ("'", '"', "`"):
+        valor = valor[1:-1].replace("\\" + valor[0], valor[0])
+    else:
+        try:
+            valor = float(valor)
+        except ValueError:
+            pass
+    return nombre, operador, valor
+
+def partes_filtro(filtro: str):
+    return [p for p in (filtro or "").split(" && ") if p.strip()]
+
+def filtrar_tabla(df: pd.DataFrame, filtro: str) -> pd.DataFrame:
+    for parte in partes_filtro(filtro):
+        columna, operador, valor = partir_filtro(parte)
+        if columna not in df.columns:
+            continue
+        serie = df[columna]
+        if operador in ("eq", "ne", "lt", "le", "gt", "ge"):
+            if isinstance(valor, str) and isinstance(serie.dtype, pd.CategoricalDtype):
+                serie = serie.astype(str)
+            try:
+                df = df.loc[getattr(serie, operador)(valor)]
+            except TypeError:
+                continue
+        elif operador == "contains":
+            df = df.loc[serie.astype(str).str.contains(str(valor), case=False, regex=False)]
+        elif operador == "datestartswith":
+            df = df.loc[serie.astype(str).str.startswith(str(valor))]
+    return df
+
+@app.callback(
+    Output("tabla-equipos", "page_current"),
+    [Input("anio-equipos", "value"), Input("vista-equipos", "value"), Input("tabla-equipos", "filter_query")]
+)
+def reiniciar_pagina_equipos(año: int, vista: str, filtro: str):
+    return 0
 
 @app.callback(
-    [Output("bar-goleadores","figure"),
-     Output("treemap-goleadores","figure"),
-     Output("radar-goleadores","figure"),
-     Output("scatter-goleadores","figure"),
-     Output("tabla-goleadores","data")],
-    [Input("anio-goleadores","value"), Input("goles-range","value")]
+    [Output("tabla-equipos", "data"), Output("tabla-equipos", "page_count")],
+    [Input("anio-equipos", "value"), Input("vista-equipos", "value"),
+     Input("tabla-equipos", "page_current"), Input("tabla-equipos", "page_size"),
+     Input("tabla-equipos", "sort_by"), Input("tabla-equipos", "filter_query")]
 )
+def pagina_equipos(año: int, vista: str, pagina: int, tamaño: int, orden: list, filtro: str):
+    if año is None:
+        return [], 1
+    try:
+        df = filtrar_tabla(equipos_vista(gestor.actual, int(año), vista), filtro)
+    except ValueError:
+        # Filtro a medio escribir o con un operador desconocido: queda la página anterior
+        raise PreventUpdate
+    if orden:
+        df = df.sort_values([o["column_id"] for o in orden],
+                            ascending=[o["direction"] == "asc" for o in orden], kind="mergesort")
+    tamaño = tamaño or 10
+    inicio = (pagina or 0) * tamaño
+    return df.iloc[inicio:inicio + tamaño].to_dict("records"), max(1, math.ceil(len(df) / tamaño))
+
+SALIDAS_GOLEADORES = [Output("bar-goleadores","figure"),
+                      Output("treemap-goleadores","figure"),
+                      Output("radar-goleadores","figure"),
+                      Output("scatter-goleadores","figure"),
+                      Output("tabla-goleadores","data")]
+
 def actualizar_goleadores(año: int, rng: list):
-    df_año = goleadores[(goleadores["Año"]==año)&
-                           (goleadores["G"]>=rng[0])&(goleadores["G"]<=rng[1])].sort_values("G", ascending=False)
+    if año is None or not rng:
+        raise PreventUpdate
+    año = int(año)
+    lo, hi = sorted(int(v) for v in rng)
+    snap = gestor.actual
+    clave = ("goleadores", snap.version, año, lo, hi)
+    with medir_callback("goleadores", año, lo, hi):
+        return cache_figuras.obtener(clave, lambda: figuras_goleadores(snap, año, lo, hi))
+
+def figuras_goleadores(snap: Instantanea, año: int, lo: int, hi: int):
+    t = time.perf_counter()
+    if snap.indice_goleadores is None:
+        df_año = consultas.goleadores_rango(año, lo, hi)
+    else:
+        df_año = snap.indice_goleadores.rango(año, lo, hi)
+    t = medir_etapa("goleadores", "datos", t)
 
     fig1 = px.bar(df_año.head(10), x="Jugador", y="G", color="Equipo",
                   title=f"Top Goleadores - Mundial {año}", text="G")
-    fig1.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
-                       font_color=COLORS['dark_gray'])
     fig1.update_traces(textposition='outside')
 
-    df_eq_sum = df_año.groupby("Equipo")["G"].sum().reset_index()
+    df_eq_sum = df_año.groupby("Equipo", observed=True)["G"].sum().reset_index()
     fig2 = px.treemap(df_eq_sum, path=["Equipo"], values="G",
                       title="Goles por País")
-    fig2.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
-                       font_color=COLORS['dark_gray'])
 
     top5 = df_año.head(5)
     fig3 = go.Figure()
@@ -511,10 +989,257 @@ def actualizar_goleadores(año: int, rng: list):
                        title="Comparativa Top 5")
 
     fig4 = px.scatter(df_año, x="G", y="Jugador", size="G", color="Equipo",
-                      title="Rendimiento Individual")
-    fig4.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
-                       font_color=COLORS['dark_gray'])
+                      title="Rendimiento Individual", render_mode="webgl")
 
+    medir_etapa("goleadores", "figuras", t)
     return fig1, fig2, fig3, fig4, df_año.head(15).to_dict("records")
+
+def datos_goleadores_año(año: int):
+    # Todos los goleadores del Mundial, ordenados por goles; el navegador aplica el rango
+    if año is None:
+        raise PreventUpdate
+    año = int(año)
+    snap = gestor.actual
+
+    def construir():
+        if snap.indice_goleadores is None:
+            df = consultas.goleadores_rango(año, 0, float("inf"))
+        else:
+            df = snap.indice_goleadores.rango(año, 0, float("inf"))
+        return {"año": año, "Jugador": df["Jugador"].astype(str).tolist(),
+                "Equipo": df["Equipo"].astype(str).tolist(), "G": df["G"].astype(int).tolist()}
+    return cache_figuras.obtener(("datos-goleadores", snap.version, año), construir)
+
+def diferido(callback):
+    # No calcula nada hasta que assets/carga_diferida.js avisa que la sección está en pantalla
+    def envoltura(*args):
+        *entradas, visible = args
+        if not visible:
+            raise PreventUpdate
+        return callback(*entradas)
+    return envoltura if CARGA_DIFERIDA else callback
+
+VISIBLE_GOLEADORES = [Input("activar-goleadores", "n_clicks")] if CARGA_DIFERIDA else []
+
+if MODO_CLIENTE:
+    # En el servidor solo queda el cambio de Mundial; arrastrar el slider no genera requests
+    app.callback(Output("datos-goleadores-año", "data"),
+                 [Input("anio-goleadores", "value")] + VISIBLE_GOLEADORES)(diferido(datos_goleadores_año))
+    # La plantilla llega al cargar la página (version-datos dispara en la carga inicial)
+    app.callback(Output("plantillas-goleadores", "data"), Input("version-datos", "data"))(plantillas_goleadores)
+    app.clientside_callback(
+        ClientsideFunction(namespace="goleadores", function_name="actualizar"),
+        SALIDAS_GOLEADORES,
+        [Input("datos-goleadores-año", "data"), Input("goles-range", "value"),
+         Input("plantillas-goleadores", "data")]
+    )
+else:
+    app.callback(SALIDAS_GOLEADORES,
+                 [Input("anio-goleadores","value"), Input("goles-range","value")] + VISIBLE_GOLEADORES
+                 )(diferido(actualizar_goleadores))
+
+SALIDAS_HISTORICO = [Output("bar-historico", "figure"),
+                     Output("trayectoria-historico", "figure"),
+                     Output("acumulado-historico", "figure"),
+                     Output("ranking-historico", "figure")]
+
+def actualizar_historico(paises: list, jugadores: list):
+    paises, jugadores = tuple(paises or ()), tuple(jugadores or ())
+    snap = gestor.actual
+    if snap.historico is None:
+        raise PreventUpdate
+    clave = ("historico", snap.version, paises, jugadores)
+    with medir_callback("historico", len(paises), len(jugadores)):
+        return cache_figuras.obtener(clave, lambda: figuras_historico(snap, paises, jugadores))
+
+def figuras_historico(snap: Instantanea, paises: tuple, jugadores: tuple):
+    # Solo recortes de tablas ya calculadas; nada recorre todos los goleadores
+    t = time.perf_counter()
+    historico = snap.historico
+    top = historico.top_jugadores(15)
+    trayectoria = historico.trayectoria(jugadores)
+    acumulado = historico.serie_naciones(paises)
+    ranking = historico.ranking_naciones(paises)
+    t = medir_etapa("historico", "datos", t)
+
+    fig1 = px.bar(top, x="G", y="Etiqueta", color="Equipo", orientation="h", text="G",
+                  title="Máximos Goleadores de Todos los Mundiales", labels={"Etiqueta": "Jugador"})
+    fig1.update_yaxes(categoryorder="array", categoryarray=top["Etiqueta"].tolist(), autorange="reversed")
+
+    fig2 = px.line(trayectoria, x="Año", y="Acumulado", color="Jugador", markers=True,
+                   hover_data=["G"], title="Goles Acumulados por Jugador")
+
+    fig3 = px.line(acumulado, x="Año", y="G", color="Equipo", markers=True,
+                   title="Goles Acumulados por País")
+
+    fig4 = px.line(ranking, x="Año", y="Posición", color="Equipo", markers=True,
+                   title="Posición en la Tabla Histórica")
+    fig4.update_yaxes(autorange="reversed")
+
+    for fig in (fig2, fig3, fig4):
+        fig.update_xaxes(tickmode="array", tickvals=historico.años.tolist())
+    medir_etapa("historico", "figuras", t)
+    return fig1, fig2, fig3, fig4
+
+app.callback(SALIDAS_HISTORICO,
+             [Input("paises-historico", "value"), Input("jugadores-historico", "value")] + VISIBLE_GOLEADORES
+             )(diferido(actualizar_historico))
+
+@app.server.route("/cache-figuras")
+def estadisticas_cache():
+    return cache_figuras.estadisticas()
+
+@app.server.before_request
+def inicio_request():
+    flask.g.inicio_request = time.perf_counter()
+    if GRABAR_REQUESTS and flask.request.path.endswith("_dash-update-component"):
+        grabar_request(flask.request.get_json(silent=True))
+
+_lock_grabacion = threading.Lock()
+
+def grabar_request(cuerpo: Optional[dict]):
+    if cuerpo is None:
+        return
+    linea = json.dumps(cuerpo, ensure_ascii=False) + "\n"
+    with _lock_grabacion, open(GRABAR_REQUESTS, "a", encoding="utf-8") as f:
+        f.write(linea)
+
+@app.server.after_request
+def medir_respuesta(response):
+    if flask.request.path.endswith("_dash-update-component") and "inicio_request" in flask.g:
+        cuerpo = flask.request.get_json(silent=True) or {}
+        # "..bar-equipos.figure...pie-equipos.figure.." -> bar-equipos. Solo salidas registradas:
+        # el cliente elige el texto y cada valor distinto sería una serie nueva
+        output = cuerpo.get("output") if isinstance(cuerpo, dict) else None
+        if isinstance(output, str) and output in app.callback_map:
+            salida = output.strip(".").split(".")[0]
+        else:
+            salida = "desconocida"
+        metricas.observar("dash_request_segundos", time.perf_counter() - flask.g.inicio_request, salida=salida)
+        if not response.direct_passthrough:
+            metricas.observar("dash_respuesta_bytes", len(response.get_data()), salida=salida)
+    return response
+
+@app.server.after_request
+def cache_assets(response):
+    if flask.request.path.startswith(app.get_asset_url("")) and response.status_code in (200, 304):
+        # Con ?m= la URL cambia cuando cambia el archivo, así que puede quedar en caché indefinidamente
+        if "m" in flask.request.args:
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["Cache-Control"] = f"public, max-age={CACHE_ASSETS_S}"
+    return response
+
+# Respaldo de flask-compress: JSON de los callbacks, layout y bundles de Dash con gzip.
+# Las respuestas por partes (descargas, archivos de assets/) salen como están para no armarlas en memoria
+TIPOS_COMPRIMIBLES = ("text/", "application/json", "application/javascript")
+MIN_BYTES_COMPRIMIR = 500
+
+@app.server.after_request
+def comprimir_respuesta(response):
+    if (COMPRIMIR or response.status_code != 200 or response.is_streamed or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or not response.mimetype.startswith(TIPOS_COMPRIMIBLES)):
+        return response
+    response.vary.add("Accept-Encoding")
+    if "gzip" not in flask.request.accept_encodings:
+        return response
+    datos = response.get_data()
+    if len(datos) < MIN_BYTES_COMPRIMIR:
+        return response
+    response.set_data(gzip.compress(datos, compresslevel=6))
+    response.headers["Content-Encoding"] = "gzip"
+    return response
+
+@app.server.route("/metrics")
+def exportar_metricas():
+    return flask.Response(metricas.exportar(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.server.route("/arranque")
+def reporte_arranque():
+    return ARRANQUE.reporte()
+
+@metricas.colector
+def arranque_metricas(m: Metricas):
+    for etapa, ms in ARRANQUE.etapas.items():
+        m.fijar("arranque_etapa_segundos", ms / 1000, "Duración de cada etapa del arranque del proceso", etapa=etapa)
+
+@app.server.route("/salud")
+def salud():
+    return {"estado": "ok", "pid": os.getpid(), "version_datos": gestor.actual.version}
+
+# Descargas de las vistas filtradas: /exportar/<vista>.<formato>?anio=2022&min=2&max=8&filtro=...
+# `filtro` usa la misma sintaxis que filter_query de las DataTable
+VISTAS_EXPORTABLES = ("equipos", "goleadores", "historico")
+PARAMETROS_EXPORTAR = ("anio", "vista", "min", "max", "filtro")
+
+def parametro_entero(nombre: str) -> Optional[int]:
+    valor = flask.request.args.get(nombre, "")
+    if not valor:
+        return None
+    try:
+        return int(valor)
+    except ValueError:
+        flask.abort(400, f"{nombre} debe ser un número entero")
+
+def vista_exportable(snap: Instantanea, vista: str):
+    # Los parámetros se validan aquí; las partes se calculan recién mientras se manda la respuesta
+    año = parametro_entero("anio")
+    filtro = flask.request.args.get("filtro", "")
+    # Se valida antes de empezar a mandar el archivo: un error a mitad de la respuesta la deja cortada
+    try:
+        for parte in partes_filtro(filtro):
+            partir_filtro(parte)
+    except ValueError as e:
+        flask.abort(400, str(e))
+    if vista == "equipos":
+        tipo = "top10" if flask.request.args.get("vista") == "top10" else "todos"
+        columnas = ["Equipo", "Año", "G"]
+        partes = (equipos_vista(snap, a, tipo) for a in ([año] if año is not None else snap.años_equipos))
+    elif vista == "goleadores":
+        lo = parametro_entero("min")
+        hi = parametro_entero("max")
+        lo, hi = 0 if lo is None else lo, float("inf") if hi is None else hi
+        if snap.indice_goleadores is None:
+            columnas = ["Jugador", "Equipo", "Año", "G"]
+            rango = consultas.goleadores_rango
+        else:
+            columnas = snap.indice_goleadores.columnas
+            rango = snap.indice_goleadores.rango
+        partes = (rango(a, lo, hi) for a in ([año] if año is not None else snap.años_goleadores))
+    else:
+        if snap.historico is None:
+            flask.abort(404, "El histórico no está disponible")
+        columnas = COLUMNAS_CARRERA + ["Posición"]
+        partes = [snap.historico.carreras]
+    return columnas, (filtrar_tabla(df, filtro)[columnas] for df in partes)
+
+@app.server.route("/exportar/<vista>.<formato>")
+def exportar_vista(vista: str, formato: str):
+    if vista not in VISTAS_EXPORTABLES or formato not in FORMATOS:
+        flask.abort(404)
+    if not disponible(formato):
+        flask.abort(501, f"La exportación a {formato} no está disponible en este servidor")
+    snap = gestor.actual
+    parametros = {k: flask.request.args[k] for k in PARAMETROS_EXPORTAR if flask.request.args.get(k)}
+    etag = etiqueta(snap.version, vista, formato, parametros)
+    if flask.request.if_none_match.contains_weak(etag):
+        respuesta = flask.Response(status=304)
+    else:
+        columnas, partes = vista_exportable(snap, vista)
+        content_type, _ = FORMATOS[formato]
+        respuesta = flask.Response(serializar(formato, partes, columnas), content_type=content_type)
+        nombre = f"{vista}_{parametros['anio']}" if "anio" in parametros else vista
+        respuesta.headers["Content-Disposition"] = f'attachment; filename="{nombre}.{formato}"'
+    respuesta.set_etag(etag, weak=True)
+    # Puede guardarse, pero se revalida siempre: el ETag cambia cuando cambia la versión de los datos
+    respuesta.headers["Cache-Control"] = "no-cache"
+    return respuesta
+
+ARRANQUE.marcar("callbacks")
+ARRANQUE.listo()
+
 if __name__ == "__main__":
-    app.run(debug=True)
+    # Servidor de desarrollo; en producción usar servidor.py
+    iniciar_refresco()
+    app.run(debug=os.environ.get("DASH_DEBUG", "0") == "1")
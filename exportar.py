@@ -0,0 +1,111 @@
+import hashlib
+import importlib.util
+import json
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+import pandas as pd
+
+# Descarga de las vistas filtradas del dashboard. Cada vista entrega bloques de filas y cada formato
+# los serializa de a uno: la respuesta sale por partes (chunked) sin armar el archivo completo en memoria.
+FILAS_POR_BLOQUE = int(os.environ.get("EXPORTAR_FILAS_BLOQUE", "50000"))
+
+
+def en_bloques(partes: Iterable[pd.DataFrame], filas: int = FILAS_POR_BLOQUE) -> Iterator[pd.DataFrame]:
+    for df in partes:
+        for i in range(0, len(df), filas):
+            yield df.iloc[i:i + filas]
+
+
+def _csv(bloques: Iterable[pd.DataFrame], columnas: List[str]) -> Iterator[bytes]:
+    yield pd.DataFrame(columns=columnas).to_csv(index=False).encode("utf-8")
+    for df in bloques:
+        yield df.to_csv(index=False, header=False).encode("utf-8")
+
+
+def _ndjson(bloques: Iterable[pd.DataFrame], columnas: List[str]) -> Iterator[bytes]:
+    for df in bloques:
+        if len(df):
+            texto = df.to_json(orient="records", lines=True, force_ascii=False)
+            yield (texto if texto.endswith("\n") else texto + "\n").encode("utf-8")
+
+
+class _Salida:
+    # Destino de ParquetWriter que solo junta lo escrito; tell() cuenta todo lo escrito desde el inicio
+    # para que los offsets del footer sigan bien aunque los bytes ya se hayan mandado
+    def __init__(self):
+        self.partes: List[bytes] = []
+        self.escritos = 0
+        self.closed = False
+
+    def write(self, datos) -> int:
+        datos = bytes(datos)
+        self.partes.append(datos)
+        self.escritos += len(datos)
+        return len(datos)
+
+    def tell(self) -> int:
+        return self.escritos
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def vaciar(self) -> bytes:
+        datos = b"".join(self.partes)
+        self.partes = []
+        return datos
+
+
+def _tabla_arrow(df: pd.DataFrame, esquema=None):
+    import pyarrow as pa
+    # Categorías como texto: cada bloque tendría su propio diccionario y el esquema debe ser uno solo
+    df = df.astype({c: str for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+    return pa.Table.from_pandas(df, schema=esquema, preserve_index=False)
+
+
+def _parquet(bloques: Iterable[pd.DataFrame], columnas: List[str]) -> Iterator[bytes]:
+    # Un row group por bloque; cada uno se manda en cuanto se escribe.
+    # pyarrow se importa recién aquí: pesa en el arranque y es opcional
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    salida = _Salida()
+    escritor = None
+    for df in bloques:
+        tabla = _tabla_arrow(df, escritor.schema if escritor else None)
+        if escritor is None:
+            escritor = pq.ParquetWriter(pa.PythonFile(salida, mode="w"), tabla.schema, compression="snappy")
+        escritor.write_table(tabla)
+        yield salida.vaciar()
+    if escritor is None:
+        vacia = _tabla_arrow(pd.DataFrame(columns=columnas))
+        escritor = pq.ParquetWriter(pa.PythonFile(salida, mode="w"), vacia.schema, compression="snappy")
+        escritor.write_table(vacia)
+    escritor.close()
+    yield salida.vaciar()
+
+
+# formato -> (content type, serializador)
+FORMATOS: Dict[str, Tuple[str, Callable[[Iterable[pd.DataFrame], List[str]], Iterator[bytes]]]] = {
+    "csv": ("text/csv; charset=utf-8", _csv),
+    "ndjson": ("application/x-ndjson; charset=utf-8", _ndjson),
+    "parquet": ("application/vnd.apache.parquet", _parquet),
+}
+
+
+def disponible(formato: str) -> bool:
+    return formato in FORMATOS and (formato != "parquet" or importlib.util.find_spec("pyarrow") is not None)
+
+
+def serializar(formato: str, partes: Iterable[pd.DataFrame], columnas: List[str]) -> Iterator[bytes]:
+    _, serializador = FORMATOS[formato]
+    for datos in serializador(en_bloques(partes), columnas):
+        if datos:
+            yield datos
+
+
+def etiqueta(version: str, vista: str, formato: str, parametros: Dict[str, str]) -> str:
+    # La misma versión de datos con los mismos filtros produce el mismo archivo
+    clave = json.dumps([version, vista, formato, sorted(parametros.items())], ensure_ascii=False)
+    return hashlib.sha1(clave.encode("utf-8")).hexdigest()
@@ -0,0 +1,167 @@
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+import pandas as pd
+from agregados import Agregados, huellas_por_año, sumar_huellas
+from historico import Historico
+from indice_goleadores import IndiceGoleadores
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Instantanea:
+    # Todo lo que leen los callbacks; nunca se modifica, se reemplaza completa
+    version: str
+    años_equipos: List[int]
+    años_goleadores: List[int]
+    max_goles: int
+    losequipos: Optional[pd.DataFrame] = field(default=None, repr=False)
+    goleadores: Optional[pd.DataFrame] = field(default=None, repr=False)
+    agregados: Optional[Agregados] = field(default=None, repr=False)
+    indice_goleadores: Optional[IndiceGoleadores] = field(default=None, repr=False)
+    historico: Optional[Historico] = field(default=None, repr=False)
+    # Huella de cada Mundial por colección; con ellas se detecta qué años cambiaron (incremental.py)
+    huellas: Optional[Dict[str, Dict[int, int]]] = field(default=None, repr=False)
+
+
+def version_de(losequipos: pd.DataFrame, goleadores: pd.DataFrame) -> str:
+    return version_de_huellas({"goles_por_equipo": huellas_por_año(losequipos),
+                               "goleadores_mundiales": huellas_por_año(goleadores)})
+
+
+def version_de_huellas(huellas: Dict[str, Dict[int, int]]) -> str:
+    # La versión de los datos sale siempre de las huellas por Mundial (también la de version_de)
+    return (f"{sumar_huellas(huellas['goles_por_equipo'].values()):x}-"
+            f"{sumar_huellas(huellas['goleadores_mundiales'].values()):x}")
+
+
+def instantanea_memoria(losequipos: pd.DataFrame, goleadores: pd.DataFrame,
+                        version: Optional[str] = None) -> Instantanea:
+    indice = IndiceGoleadores(goleadores)
+    huellas = {"goles_por_equipo": huellas_por_año(losequipos),
+               "goleadores_mundiales": huellas_por_año(goleadores)}
+    return Instantanea(
+        version=version or version_de_huellas(huellas),
+        años_equipos=sorted(int(a) for a in losequipos["Año"].unique()),
+        años_goleadores=[int(a) for a in indice.años()],
+        max_goles=int(goleadores["G"].max()) if not goleadores.empty else 0,
+        losequipos=losequipos,
+        goleadores=goleadores,
+        agregados=Agregados(losequipos),
+        indice_goleadores=indice,
+        historico=Historico(goleadores),
+        huellas=huellas,
+    )
+
+
+def año_de(documento: Optional[dict]) -> Optional[int]:
+    try:
+        return int(float(documento["Año"]))
+    except (TypeError, KeyError, ValueError):
+        return None
+
+
+class GestorDatos:
+    # `cargar(actual)` devuelve una Instantanea nueva o None si los datos no cambiaron
+    def __init__(self, inicial: Instantanea, cargar: Callable[[Instantanea], Optional[Instantanea]],
+                 intervalo: float = 300.0):
+        self._actual = inicial
+        self._cargar = cargar
+        self.intervalo = intervalo
+        self._pedido = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        # Mundiales cambiados por colección según los change streams; None = releer la colección completa
+        self._pendientes: Dict[str, Optional[Set[int]]] = {}
+        self._lock_pendientes = threading.Lock()
+
+    @property
+    def actual(self) -> Instantanea:
+        return self._actual
+
+    def refrescar(self) -> bool:
+        try:
+            nueva = self._cargar(self._actual)
+        except Exception as e:
+            logger.error(f"No se pudieron refrescar los datos, se mantiene la versión {self._actual.version}: {e}")
+            return False
+        if nueva is None or nueva.version == self._actual.version:
+            return False
+        self.publicar(nueva)
+        return True
+
+    def publicar(self, nueva: Instantanea):
+        # Asignar la referencia es atómico: cada callback ve la instantánea vieja o la nueva, nunca una mezcla
+        self._actual = nueva
+        logger.info(f"Datos actualizados a la versión {nueva.version}")
+
+    def solicitar(self):
+        self._pedido.set()
+
+    def marcar(self, coleccion: str, año: Optional[int]):
+        with self._lock_pendientes:
+            if año is None:
+                self._pendientes[coleccion] = None
+            elif self._pendientes.get(coleccion, set()) is not None:
+                self._pendientes.setdefault(coleccion, set()).add(año)
+
+    def tomar_pendientes(self) -> Dict[str, Optional[Set[int]]]:
+        # Si el refresco que los toma falla, el siguiente refresco completo compara contra el snapshot y se pone al día
+        with self._lock_pendientes:
+            pendientes, self._pendientes = self._pendientes, {}
+        return pendientes
+
+    def registrar_evento(self, evento: dict):
+        coleccion = evento.get("ns", {}).get("coll")
+        tipo = evento.get("operationType")
+        if coleccion is None:
+            return
+        despues = año_de(evento.get("fullDocument"))
+        antes = año_de(evento.get("fullDocumentBeforeChange"))
+        if tipo == "insert":
+            self.marcar(coleccion, despues)
+        elif tipo in ("update", "replace"):
+            self.marcar(coleccion, despues)
+            cambio_año = tipo == "replace" or "Año" in evento.get("updateDescription", {}).get("updatedFields", {})
+            if antes is not None:
+                self.marcar(coleccion, antes)
+            elif cambio_año:
+                # Sin preimagen no se sabe de qué Mundial salió el documento
+                self.marcar(coleccion, None)
+        elif tipo == "delete":
+            self.marcar(coleccion, antes)
+        else:
+            self.marcar(coleccion, None)
+
+    def iniciar(self):
+        if self._hilo is not None:
+            return
+        self._hilo = threading.Thread(target=self._bucle, name="refresco-datos", daemon=True)
+        self._hilo.start()
+
+    def _bucle(self):
+        while True:
+            self.refrescar()
+            # intervalo <= 0 deja solo los refrescos pedidos (p. ej. por change streams)
+            self._pedido.wait(self.intervalo if self.intervalo > 0 else None)
+            self._pedido.clear()
+
+    def escuchar_cambios(self, db, colecciones=("goles_por_equipo", "goleadores_mundiales")):
+        # Los change streams requieren un replica set; si no hay, queda el refresco por intervalo
+        def escuchar():
+            try:
+                pipeline = [{"$match": {"ns.coll": {"$in": list(colecciones)}}}]
+                try:
+                    # Las preimágenes (MongoDB 6+) dicen de qué Mundial era un documento borrado o movido
+                    cambios = db.watch(pipeline, full_document="updateLookup",
+                                       full_document_before_change="whenAvailable")
+                except Exception:
+                    cambios = db.watch(pipeline, full_document="updateLookup")
+                with cambios:
+                    for evento in cambios:
+                        self.registrar_evento(evento)
+                        self.solicitar()
+            except Exception as e:
+                logger.warning(f"Change streams no disponibles: {e}")
+        threading.Thread(target=escuchar, name="cambios-mongo", daemon=True).start()
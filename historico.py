@@ -0,0 +1,156 @@
+import copy
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+
+COLUMNAS_CARRERA = ["Jugador", "Equipo", "G", "Mundiales", "Primero", "Ultimo"]
+
+
+class Historico:
+    # Acumulados entre Mundiales, calculados una vez por versión de los datos.
+    # Se guardan por Mundial: un cambio en un año solo recalcula ese año y las carreras que lo tocan,
+    # y cada consulta recorta tablas ya armadas sin volver a agrupar `goleadores`.
+    def __init__(self, goleadores: pd.DataFrame):
+        g = goleadores[["Jugador", "Equipo", "Año", "G"]]
+        self._por_año: Dict[int, pd.DataFrame] = {
+            int(año): self._particion(df) for año, df in g.groupby("Año", sort=False)
+        }
+        self._naciones_año: Dict[int, pd.Series] = {
+            año: p.groupby("Equipo", sort=False)["G"].sum() for año, p in self._por_año.items()
+        }
+        self._derivar(None, None)
+
+    @staticmethod
+    def _particion(df: pd.DataFrame) -> pd.DataFrame:
+        # Goles del Mundial por carrera; un jugador es (Jugador, Equipo) y se indexa por "Jugador (Equipo)"
+        jugador = df["Jugador"].astype(str)
+        equipo = df["Equipo"].astype(str)
+        filas = pd.DataFrame({"Jugador": jugador.to_numpy(), "Equipo": equipo.to_numpy(),
+                              "G": df["G"].to_numpy(dtype="int64")},
+                             index=pd.Index((jugador + " (" + equipo + ")").to_numpy(), name="Etiqueta"))
+        return filas.groupby(level=0, sort=False).agg({"Jugador": "first", "Equipo": "first", "G": "sum"})
+
+    def _carreras_de(self, etiquetas: Optional[pd.Index]) -> pd.DataFrame:
+        partes = []
+        for año in self.años:
+            p = self._por_año[int(año)]
+            if etiquetas is not None:
+                # El índice de cada partición se reutiliza entre versiones, así la búsqueda no lo vuelve a armar
+                posiciones = p.index.get_indexer(etiquetas)
+                p = p.iloc[posiciones[posiciones >= 0]]
+            partes.append(p.assign(Año=int(año)))
+        if not partes:
+            carreras = pd.DataFrame(columns=COLUMNAS_CARRERA, index=pd.Index([], dtype=object))
+        else:
+            carreras = pd.concat(partes).groupby(level=0, sort=False).agg(
+                Jugador=("Jugador", "first"), Equipo=("Equipo", "first"), G=("G", "sum"),
+                Mundiales=("Año", "size"), Primero=("Año", "min"), Ultimo=("Año", "max"))
+        carreras = carreras.rename_axis(None)
+        carreras["Etiqueta"] = carreras.index
+        # Más goles primero, luego menos Mundiales y la etiqueta desempata: el orden no depende de cómo se armó
+        return carreras.sort_values(["G", "Mundiales", "Etiqueta"], ascending=[False, True, True], kind="mergesort")
+
+    @staticmethod
+    def _intercalar(conservadas: pd.DataFrame, nuevas: pd.DataFrame) -> pd.DataFrame:
+        # Las dos tablas ya están ordenadas: cada fila nueva se ubica por búsqueda binaria, sin reordenar todo
+        primaria = -conservadas["G"].to_numpy(dtype="int64") * 1000 + conservadas["Mundiales"].to_numpy(dtype="int64")
+        buscadas = -nuevas["G"].to_numpy(dtype="int64") * 1000 + nuevas["Mundiales"].to_numpy(dtype="int64")
+        desde = np.searchsorted(primaria, buscadas, side="left")
+        hasta = np.searchsorted(primaria, buscadas, side="right")
+        etiquetas = conservadas["Etiqueta"].to_numpy()
+        posiciones = np.array([d + np.searchsorted(etiquetas[d:h], e) if h > d else d
+                               for d, h, e in zip(desde, hasta, nuevas["Etiqueta"].to_numpy())], dtype="int64")
+        orden = np.insert(np.arange(len(conservadas)), posiciones, len(conservadas) + np.arange(len(nuevas)))
+        return pd.concat([conservadas, nuevas]).iloc[orden]
+
+    def _derivar(self, previas: Optional[pd.DataFrame], afectadas: Optional[pd.Index]):
+        self.años = np.array(sorted(self._por_año), dtype="int16")
+        if previas is None:
+            carreras = self._carreras_de(None)
+        else:
+            carreras = self._intercalar(previas.drop(afectadas, errors="ignore"), self._carreras_de(afectadas))
+        carreras["Posición"] = carreras["G"].rank(method="min", ascending=False).astype("int32")
+        self.carreras = carreras[COLUMNAS_CARRERA + ["Posición", "Etiqueta"]]
+
+        años = self.años.tolist()
+        if años:
+            por_año = pd.concat([self._naciones_año[a] for a in años], axis=1, keys=años).fillna(0)
+        else:
+            por_año = pd.DataFrame()
+        acumulado = por_año.cumsum(axis=1)
+        totales = acumulado.iloc[:, -1] if años else acumulado.sum(axis=1)
+        # Por total y, a igual total, por nombre
+        orden = np.lexsort((acumulado.index.astype(str).to_numpy(), -totales.to_numpy()))
+        acumulado = acumulado.iloc[orden]
+        self.naciones = acumulado.index.astype(str).to_numpy()
+        self._nacion = {e: i for i, e in enumerate(self.naciones)}
+        self.acumulado = acumulado.to_numpy(dtype="int32")
+        # Posición de cada país en la tabla histórica después de cada Mundial; 0 si aún no había marcado
+        rangos = acumulado.where(acumulado > 0).rank(axis=0, method="min", ascending=False)
+        self.rangos = rangos.fillna(0).to_numpy(dtype="int16")
+
+    def con_cambios(self, cambios: Dict[int, pd.DataFrame]) -> "Historico":
+        # Copia con los Mundiales de `cambios` reemplazados (vacío = borrado); solo se recalculan
+        # las carreras de los jugadores que aparecen en esos años
+        nuevo = copy.copy(self)
+        nuevo._por_año = dict(self._por_año)
+        nuevo._naciones_año = dict(self._naciones_año)
+        tocadas = []
+        for año, df in cambios.items():
+            anterior = nuevo._por_año.pop(año, None)
+            nuevo._naciones_año.pop(año, None)
+            if anterior is not None:
+                tocadas.append(anterior.index)
+            if not df.empty:
+                p = self._particion(df)
+                nuevo._por_año[año] = p
+                nuevo._naciones_año[año] = p.groupby("Equipo", sort=False)["G"].sum()
+                tocadas.append(p.index)
+        afectadas = tocadas[0].append(tocadas[1:]).unique() if tocadas else pd.Index([])
+        nuevo._derivar(self.carreras, afectadas)
+        return nuevo
+
+    def top_jugadores(self, n: int = 15) -> pd.DataFrame:
+        return self.carreras.head(n).reset_index(drop=True)
+
+    def etiquetas(self, n: int = 200) -> List[str]:
+        return self.carreras["Etiqueta"].head(n).tolist()
+
+    def trayectoria(self, etiquetas: Iterable[str]) -> pd.DataFrame:
+        etiquetas = pd.Index(list(dict.fromkeys(etiquetas)))
+        partes = []
+        for año in self.años:
+            p = self._por_año[int(año)]
+            posiciones = p.index.get_indexer(etiquetas)
+            encontradas = posiciones >= 0
+            partes.append(pd.DataFrame({"Jugador": etiquetas[encontradas], "Año": año,
+                                        "G": p["G"].to_numpy()[posiciones[encontradas]],
+                                        "_orden": np.flatnonzero(encontradas)}))
+        if not partes:
+            return pd.DataFrame(columns=["Jugador", "Año", "G", "Acumulado"])
+        df = pd.concat(partes, ignore_index=True).sort_values(["_orden", "Año"], kind="mergesort", ignore_index=True)
+        df["Acumulado"] = df.groupby("_orden")["G"].cumsum()
+        return df[["Jugador", "Año", "G", "Acumulado"]]
+
+    def top_naciones(self, n: int = 6) -> List[str]:
+        return self.naciones[:n].tolist()
+
+    def _filas_naciones(self, equipos: Iterable[str]) -> np.ndarray:
+        return np.array([self._nacion[e] for e in equipos if e in self._nacion], dtype="int64")
+
+    def serie_naciones(self, equipos: Iterable[str]) -> pd.DataFrame:
+        filas = self._filas_naciones(equipos)
+        return pd.DataFrame({
+            "Equipo": np.repeat(self.naciones[filas], len(self.años)),
+            "Año": np.tile(self.años, len(filas)),
+            "G": self.acumulado[filas].ravel(),
+        })
+
+    def ranking_naciones(self, equipos: Iterable[str]) -> pd.DataFrame:
+        filas = self._filas_naciones(equipos)
+        df = pd.DataFrame({
+            "Equipo": np.repeat(self.naciones[filas], len(self.años)),
+            "Año": np.tile(self.años, len(filas)),
+            "Posición": self.rangos[filas].ravel(),
+        })
+        return df[df["Posición"] > 0]
@@ -0,0 +1,100 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Set
+import pandas as pd
+from agregados import huellas_por_año
+from cargador import cargar_coleccion, tipos_compactos
+from gestor_datos import Instantanea, instantanea_memoria, version_de_huellas
+
+# Mantenimiento incremental de la Instantanea: los cambios se expresan por Mundial y solo
+# se recalculan las particiones de los años tocados; el resto se comparte con la versión anterior.
+TABLAS = ("goles_por_equipo", "goleadores_mundiales")
+
+
+@dataclass
+class Cambios:
+    # Contenido nuevo y completo de cada (colección, año) que cambió; un DataFrame vacío borra el año
+    por_tabla: Dict[str, Dict[int, pd.DataFrame]] = field(default_factory=lambda: {t: {} for t in TABLAS})
+
+    @property
+    def vacio(self) -> bool:
+        return not any(self.por_tabla.values())
+
+    def resumen(self) -> str:
+        return ", ".join(f"{t}: {sorted(años)}" for t, años in self.por_tabla.items() if años) or "sin cambios"
+
+
+def _partir(df: pd.DataFrame, años: Iterable[int]) -> Dict[int, pd.DataFrame]:
+    columna = df["Año"].to_numpy()
+    return {int(a): df[columna == a].reset_index(drop=True) for a in años}
+
+
+def diferencia(anterior: Instantanea, losequipos: pd.DataFrame, goleadores: pd.DataFrame) -> Cambios:
+    # Modo local: compara la huella de cada Mundial contra la instantánea anterior
+    cambios = Cambios()
+    for tabla, df in zip(TABLAS, (losequipos, goleadores)):
+        previas = (anterior.huellas or {}).get(tabla, {})
+        nuevas = huellas_por_año(df)
+        años = [a for a in set(previas) | set(nuevas) if previas.get(a) != nuevas.get(a)]
+        cambios.por_tabla[tabla] = _partir(df, años)
+    return cambios
+
+
+def cargar_cambios(db, pendientes: Dict[str, Set[int]], mundiales: Optional[Iterable[int]] = None) -> Cambios:
+    # Modo change streams: de MongoDB solo se leen los Mundiales que marcaron los eventos
+    cambios = Cambios()
+    for tabla, años in pendientes.items():
+        if tabla not in cambios.por_tabla:
+            continue
+        if mundiales:
+            años = set(años) & set(mundiales)
+        if años:
+            cambios.por_tabla[tabla] = _partir(cargar_coleccion(db, tabla, sorted(años)), años)
+    return cambios
+
+
+def reemplazar_años(df: pd.DataFrame, por_año: Dict[int, pd.DataFrame]) -> pd.DataFrame:
+    if not por_año:
+        return df
+    conservar = df[~df["Año"].isin(list(por_año))]
+    nuevos = [d for d in por_año.values() if not d.empty]
+    # Las categorías de cada parte pueden diferir; tipos_compactos las vuelve a unificar
+    return tipos_compactos(pd.concat([conservar] + nuevos, ignore_index=True))
+
+
+def aplicar_cambios(anterior: Instantanea, cambios: Cambios, losequipos: Optional[pd.DataFrame] = None,
+                    goleadores: Optional[pd.DataFrame] = None) -> Instantanea:
+    # `losequipos`/`goleadores` son las tablas completas si ya se tienen (p. ej. el mmap del snapshot);
+    # si no, se arman reemplazando los años cambiados en las de `anterior`
+    equipos = cambios.por_tabla["goles_por_equipo"]
+    jugadores = cambios.por_tabla["goleadores_mundiales"]
+    if losequipos is None:
+        losequipos = reemplazar_años(anterior.losequipos, equipos)
+    if goleadores is None:
+        goleadores = reemplazar_años(anterior.goleadores, jugadores)
+    if anterior.huellas is None or anterior.agregados is None or anterior.indice_goleadores is None:
+        return instantanea_memoria(losequipos, goleadores)
+
+    huellas = {t: dict(anterior.huellas.get(t, {})) for t in TABLAS}
+    for tabla, por_año in cambios.por_tabla.items():
+        for año, df in por_año.items():
+            huellas[tabla].pop(año, None)
+            huellas[tabla].update(huellas_por_año(df))
+    agregados = anterior.agregados
+    if equipos:
+        agregados = agregados.con_cambios(equipos)
+    indice = anterior.indice_goleadores.con_cambios(jugadores) if jugadores else anterior.indice_goleadores
+    historico = anterior.historico
+    if jugadores and historico is not None:
+        historico = historico.con_cambios(jugadores)
+    return Instantanea(
+        version=version_de_huellas(huellas),
+        años_equipos=sorted(agregados.equipos_por_año),
+        años_goleadores=[int(a) for a in indice.años()],
+        max_goles=indice.max_goles(),
+        losequipos=losequipos,
+        goleadores=goleadores,
+        agregados=agregados,
+        indice_goleadores=indice,
+        historico=historico,
+        huellas=huellas,
+    )
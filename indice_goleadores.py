@@ -0,0 +1,46 @@
+import copy
+from typing import Dict, Tuple
+import numpy as np
+import pandas as pd
+
+
+class IndiceGoleadores:
+    def __init__(self, goleadores: pd.DataFrame):
+        self.columnas = list(goleadores.columns)
+        self.vacio = goleadores.iloc[0:0]
+        self._particiones: Dict[int, Tuple[np.ndarray, Dict[str, np.ndarray]]] = {
+            int(año): self._particion(df) for año, df in goleadores.groupby("Año", sort=False)
+        }
+
+    def _particion(self, df: pd.DataFrame) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        # Orden estable por goles descendente; la clave -G queda ascendente para searchsorted
+        df = df.sort_values("G", ascending=False, kind="mergesort")
+        clave = -df["G"].to_numpy(dtype="float64")
+        return clave, {c: df[c].to_numpy() for c in self.columnas}
+
+    def con_cambios(self, cambios: Dict[int, pd.DataFrame]) -> "IndiceGoleadores":
+        # Las particiones de los años sin cambios se comparten con el índice anterior
+        nuevo = copy.copy(self)
+        nuevo._particiones = dict(self._particiones)
+        for año, df in cambios.items():
+            if df.empty:
+                nuevo._particiones.pop(año, None)
+            else:
+                nuevo._particiones[año] = self._particion(df)
+        return nuevo
+
+    def años(self):
+        return sorted(self._particiones)
+
+    def max_goles(self) -> int:
+        # La primera fila de cada partición es la de más goles
+        return max((int(-clave[0]) for clave, _ in self._particiones.values() if len(clave)), default=0)
+
+    def rango(self, año: int, lo: int, hi: int) -> pd.DataFrame:
+        particion = self._particiones.get(año)
+        if particion is None:
+            return self.vacio
+        clave, cols = particion
+        i = np.searchsorted(clave, -hi, side="left")
+        j = np.searchsorted(clave, -lo, side="right")
+        return pd.DataFrame({c: v[i:j] for c, v in cols.items()}, columns=self.columnas)
@@ -0,0 +1,195 @@
+import argparse
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+
+# Limpieza de las tablas del scraper antes de migrarlas a MongoDB.
+# Todo se resuelve por columnas (sin recorrer filas en Python) y deja los tipos finales,
+# así la migración y el dashboard ya no convierten textos a números.
+RENOMBRES = {"Nombre": "Jugador", "Goles": "G", "Goals": "G"}
+# El mismo país escrito distinto según la temporada de ESPN
+EQUIPOS_EQUIVALENTES = {
+    "Holanda": "Países Bajos",
+    "Corea": "Corea del Sur",
+    "República de Corea": "Corea del Sur",
+    "EE. UU.": "Estados Unidos",
+    "EEUU": "Estados Unidos",
+    "Chequia": "República Checa",
+}
+ENTEROS = ("POS", "P", "G", "Año")
+ORDEN = ["POS", "Jugador", "Equipo", "P", "G", "Año"]
+CLAVE_GOLEADOR = ["Jugador", "Equipo", "Año"]
+
+
+@dataclass
+class Reporte:
+    tabla: str
+    filas_entrada: int = 0
+    filas_salida: int = 0
+    pos_rellenadas: int = 0
+    textos_corregidos: int = 0
+    equipos_unificados: int = 0
+    duplicados: int = 0
+    # Columna -> filas descartadas por valor vacío, no numérico o negativo
+    invalidas: Dict[str, int] = field(default_factory=dict)
+    # Inconsistencias que no descartan filas pero conviene revisar
+    avisos: List[str] = field(default_factory=list)
+
+    @property
+    def descartadas(self) -> int:
+        return self.filas_entrada - self.filas_salida
+
+    def sumar(self, otro: "Reporte"):
+        # Junta los reportes de una tabla limpiada por bloques
+        for campo in ("filas_entrada", "filas_salida", "pos_rellenadas", "textos_corregidos",
+                      "equipos_unificados", "duplicados"):
+            setattr(self, campo, getattr(self, campo) + getattr(otro, campo))
+        for c, n in otro.invalidas.items():
+            self.invalidas[c] = self.invalidas.get(c, 0) + n
+        self.avisos += otro.avisos
+
+    def a_dict(self) -> dict:
+        return dict(asdict(self), descartadas=self.descartadas)
+
+    def texto(self) -> str:
+        lineas = [f"{self.tabla}: {self.filas_entrada} filas -> {self.filas_salida} "
+                  f"({self.duplicados} duplicadas, {sum(self.invalidas.values())} inválidas)"]
+        if self.pos_rellenadas:
+            lineas.append(f"  POS de empates rellenadas: {self.pos_rellenadas}")
+        if self.textos_corregidos or self.equipos_unificados:
+            lineas.append(f"  nombres corregidos: {self.textos_corregidos}, equipos unificados: {self.equipos_unificados}")
+        lineas += [f"  inválidas en {c}: {n}" for c, n in self.invalidas.items()]
+        lineas += [f"  aviso: {a}" for a in self.avisos]
+        return "\n".join(lineas)
+
+
+def normalizar_texto(serie: pd.Series) -> pd.Series:
+    # NFC, espacios repetidos o no separables a uno solo, sin bordes; vacío pasa a NA
+    limpio = (serie.astype("string").str.normalize("NFC")
+              .str.replace(r"\s+", " ", regex=True).str.strip())
+    return limpio.mask(limpio == "")
+
+
+def _cambios(antes: pd.Series, despues: pd.Series) -> int:
+    return int((antes.astype("string").fillna("") != despues.fillna("")).sum())
+
+
+def _enteros(df: pd.DataFrame, reporte: Reporte, obligatorias: List[str]) -> Tuple[Dict[str, pd.Series], np.ndarray]:
+    numeros = {c: pd.to_numeric(df[c], errors="coerce") for c in ENTEROS if c in df.columns}
+    malas = np.zeros(len(df), dtype=bool)
+    for c in obligatorias:
+        serie = numeros[c]
+        invalida = (serie.isna() | (serie < 0) | (serie % 1 != 0)).to_numpy()
+        if invalida.any():
+            reporte.invalidas[c] = int(invalida.sum())
+        malas |= invalida
+    return numeros, malas
+
+
+def _textos(df: pd.DataFrame, reporte: Reporte, columnas: List[str]) -> np.ndarray:
+    malas = np.zeros(len(df), dtype=bool)
+    for c in columnas:
+        limpio = normalizar_texto(df[c])
+        reporte.textos_corregidos += _cambios(df[c], limpio)
+        if c == "Equipo":
+            unificado = limpio.replace(EQUIPOS_EQUIVALENTES)
+            reporte.equipos_unificados += _cambios(limpio, unificado)
+            limpio = unificado
+        df[c] = limpio
+        invalida = limpio.isna().to_numpy()
+        if invalida.any():
+            reporte.invalidas[c] = int(invalida.sum())
+        malas |= invalida
+    return malas
+
+
+def limpiar_goleadores(df: pd.DataFrame) -> Tuple[pd.DataFrame, Reporte]:
+    reporte = Reporte("goleadores_mundiales", filas_entrada=len(df))
+    df = df.rename(columns={c: n for c, n in RENOMBRES.items() if c in df.columns and n not in df.columns})
+    df = df.reset_index(drop=True)
+    obligatorias = [c for c in ("P", "G", "Año") if c in df.columns]
+    numeros, malas = _enteros(df, reporte, obligatorias)
+    malas |= _textos(df, reporte, ["Jugador", "Equipo"])
+
+    if "POS" in numeros:
+        # ESPN deja POS vacía en los empates: hereda la posición de la fila anterior del mismo Mundial
+        pos = numeros["POS"]
+        vacias = pos.isna()
+        pos = pos.groupby(numeros["Año"]).ffill().fillna(1)
+        reporte.pos_rellenadas = int(vacias.sum())
+        numeros["POS"] = pos
+    for c, serie in numeros.items():
+        df[c] = serie
+
+    df = df.loc[~malas]
+    df = df.astype({c: "int16" for c in numeros})
+    duplicadas = df.duplicated(CLAVE_GOLEADOR, keep="first")
+    reporte.duplicados = int(duplicadas.sum())
+    df = df.loc[~duplicadas]
+    df = df[[c for c in ORDEN if c in df.columns] + [c for c in df.columns if c not in ORDEN]]
+    df = df.reset_index(drop=True)
+
+    por_año = df.groupby("Año", sort=False)
+    if "POS" in df.columns and (n := int((por_año["POS"].diff() < 0).sum())):
+        reporte.avisos.append(f"{n} filas con POS menor que la fila anterior del mismo Mundial")
+    if n := int((por_año["G"].diff() > 0).sum()):
+        reporte.avisos.append(f"{n} filas con más goles que la fila anterior del ranking")
+    if "P" in df.columns and (n := int(((df["P"] == 0) & (df["G"] > 0)).sum())):
+        reporte.avisos.append(f"{n} goleadores con goles y 0 partidos")
+    reporte.filas_salida = len(df)
+    return df, reporte
+
+
+def limpiar_equipos(df: pd.DataFrame) -> Tuple[pd.DataFrame, Reporte]:
+    reporte = Reporte("goles_por_equipo", filas_entrada=len(df))
+    df = df.rename(columns={c: n for c, n in RENOMBRES.items() if c in df.columns and n not in df.columns})
+    df = df.reset_index(drop=True)
+    numeros, malas = _enteros(df, reporte, ["G", "Año"])
+    malas |= _textos(df, reporte, ["Equipo"])
+    df = df.assign(G=numeros["G"], **{"Año": numeros["Año"]}).loc[~malas]
+    # Filas repetidas o que quedaron iguales al unificar el nombre del país se suman
+    agrupado = df.groupby(["Equipo", "Año"], as_index=False, sort=True)["G"].sum()
+    reporte.duplicados = len(df) - len(agrupado)
+    agrupado = agrupado.astype({"Año": "int16", "G": "int16"})
+    reporte.filas_salida = len(agrupado)
+    return agrupado[["Equipo", "Año", "G"]], reporte
+
+
+def equipos_desde_goleadores(goleadores: pd.DataFrame) -> pd.DataFrame:
+    # Ordenado por Mundial: la migración lee el CSV por bloques de años completos
+    equipos = goleadores.groupby(["Año", "Equipo"], as_index=False, sort=True)["G"].sum()
+    return equipos[["Equipo", "Año", "G"]].astype({"Año": "int16", "G": "int16"})
+
+
+def leer_csv(ruta: str, **opciones):
+    # Todo como texto: los tipos los decide la limpieza, no la inferencia de read_csv.
+    # Con chunksize devuelve un iterador de bloques
+    return pd.read_csv(ruta, dtype=str, encoding="utf-8", **opciones)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Limpia los CSV del scraper antes de migrarlos a MongoDB")
+    parser.add_argument("--entrada", default="goleadores_mundiales_raw.csv")
+    parser.add_argument("--salida", default="goleadores_mundiales.csv")
+    parser.add_argument("--equipos", default="goles_por_equipo.csv",
+                        help="se regenera con los goles por equipo de los goleadores limpios")
+    parser.add_argument("--reporte", default=None, help="archivo JSON con el reporte de validación")
+    parser.add_argument("--estricto", action="store_true", help="termina con error si se descartó alguna fila")
+    args = parser.parse_args()
+
+    goleadores, reporte = limpiar_goleadores(leer_csv(args.entrada))
+    goleadores.to_csv(args.salida, index=False)
+    equipos = equipos_desde_goleadores(goleadores)
+    equipos.to_csv(args.equipos, index=False)
+    print(reporte.texto())
+    print(f"{args.salida}: {len(goleadores)} filas, {args.equipos}: {len(equipos)} filas")
+    if args.reporte:
+        with open(args.reporte, "w", encoding="utf-8") as f:
+            json.dump(reporte.a_dict(), f, ensure_ascii=False, indent=2)
+    raise SystemExit(1 if args.estricto and reporte.descartadas else 0)
+
+
+if __name__ == "__main__":
+    main()
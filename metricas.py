@@ -0,0 +1,93 @@
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Métricas en memoria del proceso, exportadas en formato de texto de Prometheus.
+# Con varios workers cada uno tiene las suyas: el scrape ve las del worker que atiende.
+LIMITES_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_BYTES = (1e3, 5e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6)
+
+Etiquetas = Tuple[Tuple[str, str], ...]
+
+
+class Histograma:
+    def __init__(self, limites: Sequence[float]):
+        self.limites = tuple(limites)
+        self.cuentas = [0] * (len(self.limites) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        self.cuentas[bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+
+def _escapar(valor) -> str:
+    # Formato de texto de Prometheus: \, " y el salto de línea van escapados en los valores de etiquetas
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _formato_etiquetas(etiquetas: Etiquetas, extra: str = "") -> str:
+    partes = [f'{k}="{_escapar(v)}"' for k, v in etiquetas]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _numero(valor: float) -> str:
+    return "+Inf" if valor == float("inf") else repr(float(valor))
+
+
+class Metricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histogramas: Dict[str, Tuple[str, Sequence[float], Dict[Etiquetas, Histograma]]] = {}
+        self._valores: Dict[str, Tuple[str, str, Dict[Etiquetas, float]]] = {}
+        self._colectores: List[Callable[["Metricas"], None]] = []
+
+    def histograma(self, nombre: str, ayuda: str, limites: Sequence[float] = LIMITES_SEGUNDOS):
+        with self._lock:
+            self._histogramas.setdefault(nombre, (ayuda, limites, {}))
+
+    def observar(self, nombre: str, valor: float, **etiquetas):
+        clave = tuple(sorted(etiquetas.items()))
+        with self._lock:
+            _, limites, series = self._histogramas[nombre]
+            serie = series.get(clave)
+            if serie is None:
+                serie = series[clave] = Histograma(limites)
+            serie.observar(valor)
+
+    def fijar(self, nombre: str, valor: float, ayuda: str = "", tipo: str = "gauge", **etiquetas):
+        clave = tuple(sorted(etiquetas.items()))
+        with self._lock:
+            self._valores.setdefault(nombre, (ayuda, tipo, {}))[2][clave] = valor
+
+    def colector(self, funcion: Callable[["Metricas"], None]):
+        # Funciones que fijan valores justo antes de exportar (p. ej. estadísticas de la caché)
+        self._colectores.append(funcion)
+        return funcion
+
+    def exportar(self) -> str:
+        for funcion in self._colectores:
+            funcion(self)
+        lineas = []
+        with self._lock:
+            for nombre, (ayuda, limites, series) in sorted(self._histogramas.items()):
+                lineas.append(f"# HELP {nombre} {ayuda}")
+                lineas.append(f"# TYPE {nombre} histogram")
+                for etiquetas, h in sorted(series.items()):
+                    acumulado = 0
+                    for limite, cuenta in zip(tuple(limites) + (float("inf"),), h.cuentas):
+                        acumulado += cuenta
+                        le = _formato_etiquetas(etiquetas, f'le="{_numero(limite)}"')
+                        lineas.append(f"{nombre}_bucket{le} {acumulado}")
+                    lineas.append(f"{nombre}_sum{_formato_etiquetas(etiquetas)} {_numero(h.suma)}")
+                    lineas.append(f"{nombre}_count{_formato_etiquetas(etiquetas)} {h.total}")
+            for nombre, (ayuda, tipo, series) in sorted(self._valores.items()):
+                lineas.append(f"# HELP {nombre} {ayuda}")
+                lineas.append(f"# TYPE {nombre} {tipo}")
+                for etiquetas, valor in sorted(series.items()):
+                    lineas.append(f"{nombre}{_formato_etiquetas(etiquetas)} {_numero(valor)}")
+        return "\n".join(lineas) + "\n"
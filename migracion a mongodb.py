@@ -1,35 +1,118 @@
-import csv
-from pymongo import MongoClient
-db_client = MongoClient('mongodb://localhost:27017/')
-db = db_client['LasEstadisticasMundial']
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
+from consultas import CAMPO_HUELLA, crear_indices, huella_documento
+from limpieza import Reporte, leer_csv, limpiar_equipos, limpiar_goleadores
 
-def migrar_csv(archivo_csv, coleccion):
+# Claves naturales de cada colección para el modo upsert
+CLAVES = {
+    'goleadores_mundiales': ('Jugador', 'Equipo', 'Año'),
+    'goles_por_equipo': ('Equipo', 'Año'),
+}
+
+# Campos que se guardan de cada colección
+CAMPOS = {
+    'goleadores_mundiales': ['Jugador', 'Equipo', 'G', 'Año'],
+    'goles_por_equipo': ['Equipo', 'G', 'Año'],
+}
+
+# Los bloques del CSV se cortan por Mundial en las dos colecciones. La limpieza necesita cada Mundial
+# entero: POS se rellena dentro del año y los goles por equipo se suman por (Equipo, Año) después de
+# unificar los nombres (Holanda y Países Bajos no quedan juntos al ordenar por Equipo)
+CORTE = 'Año'
+
+def bloques_csv(archivo_csv, columna, filas):
+    # Bloques de read_csv; las filas del último valor de `columna` esperan al bloque siguiente
+    # por si siguen ahí, así ningún Mundial queda partido entre dos bloques.
+    # Si un valor reaparece después de entregado, el CSV no está agrupado y la limpieza por bloques
+    # dejaría claves repetidas: se corta con error antes de entregar ese bloque
+    entregados = set()
+    resto = None
+    for df in leer_csv(archivo_csv, chunksize=filas):
+        if resto is not None:
+            df = pd.concat([resto, df], ignore_index=True)
+        repetidos = entregados.intersection(df[columna].dropna())
+        if repetidos:
+            raise ValueError(f"{archivo_csv} no está agrupado por {columna} ({sorted(repetidos)[0]} aparece "
+                             f"en dos partes); hay que ordenarlo por {columna} antes de migrarlo")
+        distintas = np.flatnonzero(df[columna].ne(df[columna].iloc[-1]).to_numpy())
+        corte = distintas[-1] + 1 if len(distintas) else 0
+        resto = df.iloc[corte:]
+        if corte:
+            listo = df.iloc[:corte]
+            entregados.update(listo[columna].dropna())
+            yield listo
+    if resto is not None and len(resto):
+        yield resto
+
+def leer_documentos(archivo_csv, coleccion, filas_bloque=50000):
+    # La limpieza es idempotente: sobre un CSV ya limpio solo valida y deja los tipos.
+    # Se limpia y se entrega un bloque a la vez; nunca está el CSV entero en memoria
+    limpiar = limpiar_goleadores if coleccion == 'goleadores_mundiales' else limpiar_equipos
+    total = Reporte(coleccion)
+    for bloque in bloques_csv(archivo_csv, CORTE, filas_bloque):
+        df, reporte = limpiar(bloque)
+        total.sumar(reporte)
+        # astype(object) deja int y str de Python, que es lo que acepta BSON
+        for doc in df[CAMPOS[coleccion]].astype(object).to_dict('records'):
+            doc[CAMPO_HUELLA] = huella_documento(doc)
+            yield doc
+    print(total.texto())
+
+def por_lotes(docs, tamaño):
+    lote = []
+    for doc in docs:
+        lote.append(doc)
+        if len(lote) >= tamaño:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+def migrar_csv(db, archivo_csv, coleccion, modo='upsert', tamaño_lote=1000, filas_bloque=50000):
     coll = db[coleccion]
-    with open(archivo_csv, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        headers = reader.fieldnames
-        # Determinar columnas según la colección
-        if coleccion == 'goleadores_mundiales':
-            jugador = headers[0]
-            equipo_col = headers[1]
-            cols = [jugador, equipo_col, 'G', 'Año']
-        else:
-            cols = [h for h in headers if h in ('Equipo', 'Año', 'G')]
-        for row in reader:
-            doc = {}
-            if coleccion == 'goleadores_mundiales':
-                doc['Jugador'] = row.get(jugador)
-                doc['Equipo'] = row.get(equipo_col)
+    claves = CLAVES[coleccion]
+    if modo == 'upsert':
+        coll.create_index([(k, 1) for k in claves])
+    inicio = time.perf_counter()
+    filas = 0
+    errores = 0
+    for lote in por_lotes(leer_documentos(archivo_csv, coleccion, filas_bloque), tamaño_lote):
+        try:
+            if modo == 'upsert':
+                ops = [UpdateOne({k: doc[k] for k in claves}, {'$set': doc}, upsert=True) for doc in lote]
+                coll.bulk_write(ops, ordered=False)
             else:
-                doc['Equipo'] = row.get('Equipo')
-            doc['G'] = row.get('G')
-            doc['Año'] = row.get('Año')
-            coll.insert_one(doc)
+                coll.insert_many(lote, ordered=False)
+        except BulkWriteError as e:
+            errores += len(e.details.get('writeErrors', []))
+        filas += len(lote)
+    duracion = max(time.perf_counter() - inicio, 1e-9)
+    print(f"{coleccion}: {filas} filas en {duracion:.2f}s ({filas / duracion:.0f} filas/s), {errores} errores")
+    return filas
 
-losgoleadores = 'goleadores_mundiales.csv'
-losequipos = 'goles_por_equipo.csv'
+def main():
+    parser = argparse.ArgumentParser(description="Migra los CSV del scraper a MongoDB")
+    parser.add_argument('--uri', default='mongodb://localhost:27017/')
+    parser.add_argument('--db', default='LasEstadisticasMundial')
+    parser.add_argument('--modo', choices=('upsert', 'insertar'), default='upsert',
+                        help="upsert es idempotente; insertar solo agrega documentos")
+    parser.add_argument('--lote', type=int, default=1000)
+    parser.add_argument('--bloque', type=int, default=50000,
+                        help="filas del CSV que se leen y limpian a la vez")
+    parser.add_argument('--goleadores', default='goleadores_mundiales.csv')
+    parser.add_argument('--equipos', default='goles_por_equipo.csv')
+    args = parser.parse_args()
 
-eprint_gol = migrar_csv(losgoleadores, 'goleadores_mundiales')
-migrar_csv(losequipos, 'goles_por_equipo')
+    db = MongoClient(args.uri)[args.db]
+    migrar_csv(db, args.goleadores, 'goleadores_mundiales', args.modo, args.lote, args.bloque)
+    migrar_csv(db, args.equipos, 'goles_por_equipo', args.modo, args.lote, args.bloque)
+    # Índices (Año, G) y (Equipo, Año) para el modo de consultas en MongoDB del dashboard
+    crear_indices(db)
+    print(f"Migración a MongoDB completada en '{args.db}'.")
 
-print("Migración a MongoDB completada en 'LasEstadisticasMundial'.")
+if __name__ == '__main__':
+    main()
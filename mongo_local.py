@@ -0,0 +1,213 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+
+# Reemplazo en memoria de MongoDB para pruebas de carga sin servidor ni red.
+# Cubre solo lo que usan cargador.py y consultas.py: find/distinct/aggregate con $match, $project,
+# $group, $sort y $limit. Las colecciones son DataFrames, así que aguanta la escala de los benchmarks.
+# `instalar()` cambia pymongo.MongoClient: conectar() del dashboard termina aquí sin tocar su código.
+OPERADORES_FILTRO = {
+    "$eq": lambda s, v: s == v,
+    "$ne": lambda s, v: s != v,
+    "$gt": lambda s, v: s > v,
+    "$gte": lambda s, v: s >= v,
+    "$lt": lambda s, v: s < v,
+    "$lte": lambda s, v: s <= v,
+    "$in": lambda s, v: s.isin(list(v)),
+    "$nin": lambda s, v: ~s.isin(list(v)),
+}
+ACUMULADORES = {"$sum": "sum", "$max": "max", "$min": "min", "$first": "first"}
+
+
+def _numero(serie: pd.Series) -> pd.Series:
+    return pd.to_numeric(serie, errors="coerce")
+
+
+def _valor(expresion, df: pd.DataFrame):
+    if isinstance(expresion, str) and expresion.startswith("$"):
+        campo = expresion[1:]
+        return df[campo] if campo in df.columns else pd.Series(np.nan, index=df.index)
+    if not isinstance(expresion, dict):
+        return expresion
+    (operador, argumento), = expresion.items()
+    if operador == "$literal":
+        return argumento
+    if operador in ("$toDouble", "$toInt", "$toLong"):
+        numeros = _numero(_valor(argumento, df))
+        return numeros if operador == "$toDouble" else np.trunc(numeros)
+    if operador == "$convert":
+        # onError/onNull distintos de null no se usan en el dashboard
+        numeros = _numero(_valor(argumento["input"], df))
+        return numeros if argumento.get("to") == "double" else np.trunc(numeros)
+    raise NotImplementedError(f"mongo_local no implementa {operador}")
+
+
+def _mascara(df: pd.DataFrame, filtro: Optional[dict]) -> np.ndarray:
+    mascara = np.ones(len(df), dtype=bool)
+    for campo, condicion in (filtro or {}).items():
+        serie = df[campo] if campo in df.columns else pd.Series(None, index=df.index, dtype=object)
+        if not (isinstance(condicion, dict) and all(k.startswith("$") for k in condicion)):
+            condicion = {"$eq": condicion}
+        for operador, valor in condicion.items():
+            if operador not in OPERADORES_FILTRO:
+                raise NotImplementedError(f"mongo_local no implementa {operador}")
+            mascara &= OPERADORES_FILTRO[operador](serie, valor).fillna(False).to_numpy(dtype=bool)
+    return mascara
+
+
+def _proyectar(df: pd.DataFrame, proyeccion: Optional[dict]) -> pd.DataFrame:
+    if not proyeccion:
+        return df
+    columnas = {}
+    for campo, regla in proyeccion.items():
+        if regla in (0, False):
+            continue
+        if regla in (1, True):
+            if campo in df.columns:
+                columnas[campo] = df[campo]
+        else:
+            columnas[campo] = _valor(regla, df)
+    if "_id" not in proyeccion and "_id" in df.columns:
+        columnas = {"_id": df["_id"], **columnas}
+    return pd.DataFrame(columnas, index=df.index)
+
+
+def _agrupar(df: pd.DataFrame, etapa: dict) -> pd.DataFrame:
+    clave = etapa["_id"]
+    if isinstance(clave, dict):
+        claves = {f"_id.{k}": _valor(v, df) for k, v in clave.items()}
+    elif clave is None:
+        claves = {"_id": pd.Series(None, index=df.index, dtype=object)}
+    else:
+        claves = {"_id": _valor(clave, df)}
+    base = pd.DataFrame(claves, index=df.index)
+    for campo, acumulador in etapa.items():
+        if campo == "_id":
+            continue
+        (operador, argumento), = acumulador.items()
+        if operador not in ACUMULADORES:
+            raise NotImplementedError(f"mongo_local no implementa {operador}")
+        valor = _valor(argumento, df)
+        base[campo] = _numero(valor) if operador == "$sum" else valor
+    agregaciones = {c: ACUMULADORES[next(iter(a))] for c, a in etapa.items() if c != "_id"}
+    return base.groupby(list(claves), sort=False, dropna=False).agg(agregaciones).reset_index()
+
+
+def _ordenar(df: pd.DataFrame, orden) -> pd.DataFrame:
+    pares = list(orden.items()) if isinstance(orden, dict) else list(orden)
+    if not pares or df.empty:
+        return df
+    return df.sort_values([c for c, _ in pares], ascending=[d == 1 for _, d in pares], kind="mergesort")
+
+
+def _documentos(df: pd.DataFrame) -> Iterator[dict]:
+    # Las claves "_id.x" de $group vuelven a ser subdocumentos; NaN vuelve a ser null
+    anidadas = [c for c in df.columns if "." in c]
+    for fila in df.astype(object).where(df.notna(), None).to_dict("records"):
+        for columna in anidadas:
+            padre, hijo = columna.split(".", 1)
+            fila.setdefault(padre, {})[hijo] = fila.pop(columna)
+        yield fila
+
+
+class CursorLocal:
+    def __init__(self, df: pd.DataFrame):
+        self._df = df
+        self._orden = None
+        self._limite = 0
+        self._iterador: Optional[Iterator[dict]] = None
+
+    def sort(self, campo, direccion: int = 1) -> "CursorLocal":
+        self._orden = [(campo, direccion)] if isinstance(campo, str) else list(campo)
+        return self
+
+    def limit(self, n: int) -> "CursorLocal":
+        self._limite = n
+        return self
+
+    def __iter__(self) -> "CursorLocal":
+        return self
+
+    def __next__(self) -> dict:
+        # Como en pymongo, sort/limit valen hasta que se pide el primer documento
+        if self._iterador is None:
+            df = self._df if self._orden is None else _ordenar(self._df, self._orden)
+            self._iterador = _documentos(df.head(self._limite) if self._limite else df)
+        return next(self._iterador)
+
+
+class ColeccionLocal:
+    def __init__(self, df: Optional[pd.DataFrame] = None):
+        self.df = df if df is not None else pd.DataFrame()
+
+    def insert_many(self, documentos: Iterable[dict]):
+        self.df = pd.concat([self.df, pd.DataFrame(list(documentos))], ignore_index=True)
+
+    def create_index(self, *args, **kwargs):
+        pass
+
+    def estimated_document_count(self) -> int:
+        return len(self.df)
+
+    def count_documents(self, filtro: dict) -> int:
+        return int(_mascara(self.df, filtro).sum())
+
+    def distinct(self, campo: str) -> list:
+        return self.df[campo].dropna().unique().tolist() if campo in self.df.columns else []
+
+    def find(self, filtro: Optional[dict] = None, proyeccion: Optional[dict] = None) -> CursorLocal:
+        return CursorLocal(_proyectar(self.df[_mascara(self.df, filtro)], proyeccion))
+
+    def aggregate(self, pipeline: List[dict], **opciones) -> Iterator[dict]:
+        df = self.df
+        for etapa in pipeline:
+            (nombre, argumento), = etapa.items()
+            if nombre == "$match":
+                df = df[_mascara(df, argumento)]
+            elif nombre == "$project":
+                df = _proyectar(df, argumento)
+            elif nombre == "$group":
+                df = _agrupar(df, argumento)
+            elif nombre == "$sort":
+                df = _ordenar(df, argumento)
+            elif nombre == "$limit":
+                df = df.head(argumento)
+            else:
+                raise NotImplementedError(f"mongo_local no implementa {nombre}")
+        return _documentos(df)
+
+
+class BaseLocal:
+    def __init__(self):
+        self._colecciones: Dict[str, ColeccionLocal] = {}
+
+    def __getitem__(self, nombre: str) -> ColeccionLocal:
+        return self._colecciones.setdefault(nombre, ColeccionLocal())
+
+    def __getattr__(self, nombre: str) -> ColeccionLocal:
+        if nombre.startswith("_"):
+            raise AttributeError(nombre)
+        return self[nombre]
+
+    def list_collection_names(self) -> List[str]:
+        return list(self._colecciones)
+
+
+class ClienteLocal:
+    # Todas las instancias comparten las mismas bases, como varios clientes contra un mismo servidor
+    bases: Dict[str, BaseLocal] = {}
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getitem__(self, nombre: str) -> BaseLocal:
+        return self.bases.setdefault(nombre, BaseLocal())
+
+    def close(self):
+        pass
+
+
+def instalar():
+    import pymongo
+    pymongo.MongoClient = ClienteLocal
+    return ClienteLocal()
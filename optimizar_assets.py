@@ -0,0 +1,60 @@
+import argparse
+import glob
+import logging
+import os
+import shutil
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+# Genera variantes livianas de los GIF de assets/: un MP4 (H.264) y un WebP animado.
+# dashboard1.imagen_animada usa la primera que encuentre; sin ellas sigue sirviendo el GIF.
+# Necesita ffmpeg en el PATH (con libx264 y libwebp).
+CARPETA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+VARIANTES = {
+    ".mp4": ["-movflags", "+faststart", "-pix_fmt", "yuv420p",
+             "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2", "-c:v", "libx264", "-crf", "28", "-an"],
+    ".webp": ["-c:v", "libwebp", "-lossless", "0", "-q:v", "70", "-loop", "0", "-an"],
+}
+
+
+def convertir(ffmpeg: str, gif: str, extension: str, forzar: bool = False) -> bool:
+    destino = os.path.splitext(gif)[0] + extension
+    if not forzar and os.path.exists(destino) and os.path.getmtime(destino) >= os.path.getmtime(gif):
+        return True
+    temporal = destino + ".tmp" + extension
+    comando = [ffmpeg, "-y", "-loglevel", "error", "-i", gif] + VARIANTES[extension] + [temporal]
+    try:
+        subprocess.run(comando, check=True)
+    except subprocess.CalledProcessError as e:
+        logger.warning(f"No se pudo generar {destino}: {e}")
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        return False
+    os.replace(temporal, destino)
+    logger.info(f"{os.path.basename(gif)} ({os.path.getsize(gif) / 1024:.0f} KB) -> "
+                f"{os.path.basename(destino)} ({os.path.getsize(destino) / 1024:.0f} KB)")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera variantes MP4/WebP de los GIF de assets/")
+    parser.add_argument("--carpeta", default=CARPETA)
+    parser.add_argument("--forzar", action="store_true", help="regenera aunque la variante esté al día")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        logger.error("ffmpeg no está instalado; el dashboard seguirá sirviendo los GIF originales")
+        raise SystemExit(1)
+    fallos = 0
+    for gif in sorted(glob.glob(os.path.join(args.carpeta, "*.gif"))):
+        for extension in VARIANTES:
+            fallos += not convertir(ffmpeg, gif, extension, args.forzar)
+    raise SystemExit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+import argparse
+import http.client
+import itertools
+import json
+import logging
+import os
+import random
+import signal
+import socket
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+import numpy as np
+
+# Prueba de carga del dashboard en una sola máquina: sin MongoDB, sin navegador y sin red.
+# Siembra mongo_local (MongoDB en memoria) a la escala pedida, levanta el servidor con varios workers
+# y repite requests de _dash-update-component con la concurrencia pedida.
+# Reporta throughput, latencias por callback, errores y memoria de cada worker.
+# Uso:
+#   python prueba_carga.py --escala 10 --workers 4 --concurrencia 32 --duracion 30
+#   GRABAR_REQUESTS=sesion.jsonl python dashboard1.py        (se navega el dashboard y se graba)
+#   python prueba_carga.py --grabacion sesion.jsonl          (mismos CARGA_DIFERIDA/MODO_CLIENTE que al grabar)
+BASE = "LasEstadisticasMundial"
+SALIDAS_EQUIPOS = [("bar-equipos", "figure"), ("pie-equipos", "figure"), ("line-equipos", "figure")]
+SALIDAS_GOLEADORES = [("bar-goleadores", "figure"), ("treemap-goleadores", "figure"),
+                      ("radar-goleadores", "figure"), ("scatter-goleadores", "figure"),
+                      ("tabla-goleadores", "data")]
+
+logger = logging.getLogger(__name__)
+
+
+def sembrar(escala: int):
+    # Los documentos quedan como después de la migración: textos y enteros, sin categorías
+    import mongo_local
+    from benchmark_dashboard import generar_datos
+    from consultas import CAMPO_HUELLA, huella_documento
+
+    db = mongo_local.instalar()[BASE]
+    for coleccion, df in zip(("goles_por_equipo", "goleadores_mundiales"), generar_datos(escala)):
+        df = df.astype({c: str for c in df.columns if str(df[c].dtype) == "category"})
+        documentos = df.astype(object).to_dict("records")
+        for doc in documentos:
+            doc[CAMPO_HUELLA] = huella_documento(doc)
+        db[coleccion].insert_many(documentos)
+        logger.info(f"{coleccion}: {len(df)} documentos en mongo_local")
+
+
+def cuerpos_generados(tablero) -> List[dict]:
+    # Los dos callbacks principales recorriendo todos los Mundiales y varias vistas/rangos
+    from benchmark_dashboard import cuerpo_dash
+
+    snap = tablero.gestor.actual
+    visible = [("activar-goleadores", "n_clicks", 1)] if tablero.CARGA_DIFERIDA else []
+    cuerpos = [cuerpo_dash(SALIDAS_EQUIPOS, [("anio-equipos", "value", a), ("vista-equipos", "value", v)])
+               for a in snap.años_equipos for v in ("top10", "todos")]
+    for a in snap.años_goleadores:
+        if tablero.MODO_CLIENTE:
+            cuerpos.append(cuerpo_dash([("datos-goleadores-año", "data")],
+                                       [("anio-goleadores", "value", a)] + visible))
+            continue
+        for lo in (0, 2, 5):
+            cuerpos.append(cuerpo_dash(SALIDAS_GOLEADORES,
+                                       [("anio-goleadores", "value", a),
+                                        ("goles-range", "value", [lo, snap.max_goles])] + visible))
+    return cuerpos
+
+
+def cuerpos_grabados(ruta: str) -> List[dict]:
+    with open(ruta, "r", encoding="utf-8") as f:
+        return [json.loads(linea) for linea in f if linea.strip()]
+
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def servir_gunicorn(puerto: int, workers: int, hilos: int):
+    # Lo mismo que servidor.py en producción, pero escuchando solo en localhost
+    from servidor import ServidorDash, post_fork
+    ServidorDash({
+        "bind": f"127.0.0.1:{puerto}",
+        "workers": workers,
+        "threads": hilos,
+        "worker_class": "gthread",
+        "timeout": 120,
+        "preload_app": True,
+        "post_fork": post_fork,
+        "loglevel": "warning",
+    }).run()
+
+
+def servir_werkzeug(app, puerto: int, workers: int) -> List[int]:
+    # Sin gunicorn: un socket compartido y un proceso por worker, forkeados después de cargar los datos
+    from werkzeug.serving import make_server
+
+    escucha = socket.create_server(("127.0.0.1", puerto), backlog=1024)
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            logging.getLogger("werkzeug").setLevel(logging.WARNING)
+            try:
+                make_server("127.0.0.1", puerto, app, threaded=True, fd=escucha.fileno()).serve_forever()
+            finally:
+                os._exit(0)
+        pids.append(pid)
+    escucha.close()
+    return pids
+
+
+def hijos(pid: int) -> List[int]:
+    encontrados = []
+    for entrada in os.listdir("/proc"):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entrada}/stat", "r") as f:
+                # El nombre del proceso va entre paréntesis y puede tener espacios
+                campos = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(campos[1]) == pid:
+            encontrados.append(int(entrada))
+    return sorted(encontrados)
+
+
+def memoria(pid: int) -> Optional[Dict[str, float]]:
+    # Rss cuenta también las páginas compartidas con el maestro; Pss las reparte entre quienes las comparten
+    valores = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for linea in f:
+                clave, _, resto = linea.partition(":")
+                if clave in ("Rss", "Pss"):
+                    valores[clave.lower() + "_mb"] = int(resto.split()[0]) / 1024
+    except OSError:
+        return None
+    return valores
+
+
+class Muestreo(threading.Thread):
+    def __init__(self, pids: List[int], intervalo: float = 0.5):
+        super().__init__(daemon=True)
+        self.pids = pids
+        self.intervalo = intervalo
+        self.inicial = {pid: memoria(pid) for pid in pids}
+        self.maximos: Dict[int, Dict[str, float]] = defaultdict(dict)
+        self.terminar = threading.Event()
+
+    def run(self):
+        while not self.terminar.wait(self.intervalo):
+            for pid in self.pids:
+                for clave, valor in (memoria(pid) or {}).items():
+                    self.maximos[pid][clave] = max(self.maximos[pid].get(clave, 0.0), valor)
+
+    def reporte(self) -> List[dict]:
+        return [{"pid": pid,
+                 "rss_inicial_mb": (self.inicial[pid] or {}).get("rss_mb"),
+                 "rss_max_mb": self.maximos[pid].get("rss_mb"),
+                 "pss_max_mb": self.maximos[pid].get("pss_mb")} for pid in self.pids]
+
+
+def esperar_servidor(puerto: int, limite_s: float = 60):
+    fin = time.monotonic() + limite_s
+    while time.monotonic() < fin:
+        try:
+            conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=2)
+            conexion.request("GET", "/salud")
+            if conexion.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"El servidor no respondió en {limite_s:.0f}s")
+
+
+def salida_de(cuerpo: dict) -> str:
+    return str(cuerpo.get("output", "")).strip(".").split(".")[0] or "desconocida"
+
+
+def disparar(puerto: int, cuerpos: List[bytes], salidas: List[str], concurrencia: int,
+             duracion_s: float, limite_requests: int = 0) -> dict:
+    # Cada hilo es un cliente con su conexión; toman los cuerpos en orden y vuelven a empezar
+    siguiente = itertools.count()
+    fin = time.perf_counter() + duracion_s
+    registros = []
+    lock = threading.Lock()
+
+    def cliente():
+        conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=60)
+        propios = []
+        while time.perf_counter() < fin:
+            i = next(siguiente)
+            if limite_requests and i >= limite_requests:
+                break
+            cuerpo = cuerpos[i % len(cuerpos)]
+            inicio = time.perf_counter()
+            try:
+                conexion.request("POST", "/_dash-update-component", body=cuerpo,
+                                 headers={"Content-Type": "application/json"})
+                respuesta = conexion.getresponse()
+                tamaño = len(respuesta.read())
+                error = None if respuesta.status == 200 else str(respuesta.status)
+            except (OSError, http.client.HTTPException) as e:
+                conexion.close()
+                conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=60)
+                tamaño, error = 0, type(e).__name__
+            propios.append((salidas[i % len(cuerpos)], time.perf_counter() - inicio, tamaño, error))
+        conexion.close()
+        with lock:
+            registros.extend(propios)
+
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=cliente) for _ in range(concurrencia)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    return resumir(registros, time.perf_counter() - inicio)
+
+
+def latencias(segundos: List[float]) -> dict:
+    if not segundos:
+        return {}
+    ms = np.array(segundos) * 1000
+    return {"p50_ms": float(np.percentile(ms, 50)), "p90_ms": float(np.percentile(ms, 90)),
+            "p95_ms": float(np.percentile(ms, 95)), "p99_ms": float(np.percentile(ms, 99)),
+            "max_ms": float(ms.max()), "media_ms": float(ms.mean())}
+
+
+def resumir(registros: list, duracion: float) -> dict:
+    errores = Counter(e for _, _, _, e in registros if e is not None)
+    por_salida = defaultdict(list)
+    for registro in registros:
+        por_salida[registro[0]].append(registro)
+    return {
+        "requests": len(registros),
+        "duracion_s": duracion,
+        "por_segundo": len(registros) / max(duracion, 1e-9),
+        "errores": sum(errores.values()),
+        "tasa_errores": sum(errores.values()) / max(len(registros), 1),
+        "errores_por_tipo": dict(errores),
+        "bytes_medios": float(np.mean([t for _, _, t, _ in registros])) if registros else 0.0,
+        "latencia": latencias([s for _, s, _, _ in registros]),
+        "por_callback": {
+            salida: {"requests": len(filas), "errores": sum(e is not None for *_, e in filas),
+                     "latencia": latencias([s for _, s, _, _ in filas])}
+            for salida, filas in sorted(por_salida.items())
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del dashboard contra MongoDB en memoria")
+    parser.add_argument("--escala", type=int, default=1, help="tamaño de los datos, como en benchmark_dashboard.py")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--hilos", type=int, default=4, help="hilos por worker (gunicorn gthread)")
+    parser.add_argument("--concurrencia", type=int, default=16, help="clientes simultáneos")
+    parser.add_argument("--duracion", type=float, default=20, help="segundos medidos")
+    parser.add_argument("--calentamiento", type=float, default=3, help="segundos de carga previa que no se miden")
+    parser.add_argument("--requests", type=int, default=0, help="corta después de tantos requests (0 = sin límite)")
+    parser.add_argument("--grabacion", default=None, help="JSONL grabado con GRABAR_REQUESTS")
+    parser.add_argument("--servidor", choices=("auto", "gunicorn", "werkzeug"), default="auto")
+    parser.add_argument("--modo", choices=("memoria", "mongo"), default="memoria", help="MODO_CONSULTA del dashboard")
+    parser.add_argument("--semilla", type=int, default=181184)
+    parser.add_argument("--salida", default=None, help="archivo JSON con el reporte")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    # Los datos salen de mongo_local; el refresco en segundo plano queda apagado durante la medición
+    os.environ.update({"REFRESCO_MONGO": "0", "MODO_CONSULTA": args.modo,
+                       "SNAPSHOT_DIR": tempfile.mkdtemp(prefix="carga-snapshot-")})
+    os.environ.setdefault("CARGA_DIFERIDA", "0")
+    os.environ.setdefault("MODO_CLIENTE", "0")
+    os.environ.pop("GRABAR_REQUESTS", None)
+    sembrar(args.escala)
+    import dashboard1 as tablero
+    # Primera carga desde mongo_local por el mismo camino que en producción (datoss, snapshot)
+    tablero.gestor.refrescar()
+
+    cuerpos = cuerpos_grabados(args.grabacion) if args.grabacion else cuerpos_generados(tablero)
+    random.Random(args.semilla).shuffle(cuerpos)
+    salidas = [salida_de(c) for c in cuerpos]
+    cuerpos = [json.dumps(c).encode("utf-8") for c in cuerpos]
+
+    servidor = args.servidor
+    if servidor == "auto":
+        try:
+            import gunicorn  # noqa: F401
+            servidor = "gunicorn"
+        except ImportError:
+            servidor = "werkzeug"
+    puerto = puerto_libre()
+    if servidor == "gunicorn":
+        maestro = os.fork()
+        if maestro == 0:
+            try:
+                servir_gunicorn(puerto, args.workers, args.hilos)
+            finally:
+                os._exit(0)
+        procesos = [maestro]
+    else:
+        procesos = servir_werkzeug(tablero.app.server, puerto, args.workers)
+
+    try:
+        esperar_servidor(puerto)
+        workers = procesos
+        if servidor == "gunicorn":
+            # /salud ya respondió uno; se espera a que el maestro termine de forkear el resto
+            fin = time.monotonic() + 30
+            while len(workers := hijos(procesos[0])) < args.workers and time.monotonic() < fin:
+                time.sleep(0.2)
+        muestreo = Muestreo(workers)
+        muestreo.start()
+        if args.calentamiento > 0:
+            disparar(puerto, cuerpos, salidas, args.concurrencia, args.calentamiento)
+        logger.info(f"Midiendo {args.duracion:.0f}s con {args.concurrencia} clientes contra "
+                    f"{args.workers} workers ({servidor}), {len(cuerpos)} requests distintos")
+        resultado = disparar(puerto, cuerpos, salidas, args.concurrencia, args.duracion, args.requests)
+        muestreo.terminar.set()
+        muestreo.join()
+    finally:
+        # SIGINT: gunicorn corta sin esperar el apagado ordenado de los workers
+        for pid in procesos:
+            os.kill(pid, signal.SIGINT if servidor == "gunicorn" else signal.SIGTERM)
+        for pid in procesos:
+            os.waitpid(pid, 0)
+
+    reporte = {
+        "configuracion": {"escala": args.escala, "servidor": servidor, "workers": args.workers,
+                          "hilos": args.hilos, "concurrencia": args.concurrencia, "modo": args.modo,
+                          "grabacion": args.grabacion, "requests_distintos": len(cuerpos),
+                          "cache_figuras_dir": os.environ.get("CACHE_FIGURAS_DIR"),
+                          "carga_diferida": tablero.CARGA_DIFERIDA, "modo_cliente": tablero.MODO_CLIENTE},
+        **resultado,
+        "memoria_workers": muestreo.reporte(),
+    }
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+    print(texto)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    # Un request con error mide la página de error, no el callback: la prueba no vale
+    if resultado["errores"]:
+        logger.error(f"{resultado['errores']} requests con error: {resultado['errores_por_tipo']}")
+    raise SystemExit(1 if resultado["requests"] == 0 or resultado["errores"] else 0)
+
+
+if __name__ == "__main__":
+    main()
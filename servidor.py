@@ -0,0 +1,54 @@
+import argparse
+import multiprocessing
+import os
+import tempfile
+from gunicorn.app.base import BaseApplication
+
+# Punto de entrada de producción: gunicorn con varios workers sobre app.server.
+# El dashboard se importa una vez en el proceso maestro (preload) y los workers heredan
+# los DataFrames por copy-on-write; la caché de figuras va a disco para compartirla entre todos.
+
+
+def post_fork(server, worker):
+    from dashboard1 import iniciar_refresco
+    iniciar_refresco()
+
+
+class ServidorDash(BaseApplication):
+    def __init__(self, opciones: dict):
+        self.opciones = opciones
+        super().__init__()
+
+    def load_config(self):
+        for clave, valor in self.opciones.items():
+            self.cfg.set(clave, valor)
+
+    def load(self):
+        from dashboard1 import app
+        return app.server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de producción del dashboard")
+    parser.add_argument("--bind", default=os.environ.get("BIND", "0.0.0.0:8050"))
+    parser.add_argument("--workers", type=int,
+                        default=int(os.environ.get("WORKERS", multiprocessing.cpu_count())))
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("THREADS", "4")))
+    parser.add_argument("--timeout", type=int, default=int(os.environ.get("TIMEOUT", "60")))
+    args = parser.parse_args()
+
+    os.environ.setdefault("CACHE_FIGURAS_DIR", os.path.join(tempfile.gettempdir(), "estadistigol-figuras"))
+    ServidorDash({
+        "bind": args.bind,
+        "workers": args.workers,
+        "threads": args.threads,
+        "worker_class": "gthread",
+        "timeout": args.timeout,
+        "preload_app": True,
+        "post_fork": post_fork,
+        "accesslog": "-",
+    }).run()
+
+
+if __name__ == "__main__":
+    main()
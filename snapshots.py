@@ -0,0 +1,145 @@
+import argparse
+import glob
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Formato: un manifiesto JSON + arreglos .npy que se abren con mmap.
+# Las columnas numéricas de cada tabla van juntas en un solo bloque (columnas x filas), igual que
+# las guarda pandas, así el DataFrame se arma sobre el mmap sin copiar y los workers comparten páginas.
+MANIFIESTO = "snapshot.json"
+
+
+def _ruta(carpeta: str, nombre: str) -> str:
+    return os.path.join(carpeta, nombre)
+
+
+def _guardar(ruta: str, arreglo: np.ndarray):
+    # Nunca se trunca un .npy existente: otro proceso puede tenerlo abierto con mmap y recibiría SIGBUS.
+    # Se escribe aparte y se reemplaza; quien ya lo tenía mapeado sigue viendo el archivo anterior.
+    temporal = f"{ruta}.tmp-{os.getpid()}"
+    with open(temporal, "wb") as f:
+        np.save(f, arreglo)
+    os.replace(temporal, ruta)
+
+
+def _escribir_tabla(carpeta: str, tabla: str, df: pd.DataFrame, version: str) -> dict:
+    numericas = [c for c in df.columns if not isinstance(df[c].dtype, pd.CategoricalDtype)]
+    categoricas = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+    archivo_num = f"{tabla}-{version}.num.npy"
+    bloque = np.ascontiguousarray(df[numericas].to_numpy(dtype="int16").T)
+    _guardar(_ruta(carpeta, archivo_num), bloque)
+    info = {"filas": len(df), "columnas": list(df.columns), "numericas": numericas,
+            "archivo": archivo_num, "categoricas": {}}
+    for c in categoricas:
+        archivo = f"{tabla}-{version}.{c}.npy"
+        _guardar(_ruta(carpeta, archivo), df[c].cat.codes.to_numpy())
+        info["categoricas"][c] = {"archivo": archivo, "categorias": [str(v) for v in df[c].cat.categories]}
+    return info
+
+
+def exportar_snapshot(carpeta: str, losequipos: pd.DataFrame, goleadores: pd.DataFrame, version: str):
+    os.makedirs(carpeta, exist_ok=True)
+    manifiesto = {
+        "version": version,
+        "creado": datetime.now().isoformat(timespec="seconds"),
+        "tablas": {
+            "goles_por_equipo": _escribir_tabla(carpeta, "goles_por_equipo", losequipos, version),
+            "goleadores_mundiales": _escribir_tabla(carpeta, "goleadores_mundiales", goleadores, version),
+        },
+    }
+    # El manifiesto se reemplaza al final: quien lee ve la versión vieja completa o la nueva completa
+    temporal = _ruta(carpeta, MANIFIESTO + ".tmp")
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+    os.replace(temporal, _ruta(carpeta, MANIFIESTO))
+    # Los archivos de versiones anteriores se borran; en Linux los mmap abiertos siguen siendo válidos
+    for ruta in glob.glob(_ruta(carpeta, "*.npy")):
+        if f"-{version}." not in os.path.basename(ruta):
+            os.remove(ruta)
+    logger.info(f"Snapshot {version} exportado en {carpeta}")
+
+
+def _leer_tabla(carpeta: str, info: dict) -> pd.DataFrame:
+    bloque = np.load(_ruta(carpeta, info["archivo"]), mmap_mode="r")
+    df = pd.DataFrame(bloque.T, columns=info["numericas"], copy=False)
+    for c in info["columnas"]:
+        if c in info["categoricas"]:
+            cat = info["categoricas"][c]
+            codigos = np.load(_ruta(carpeta, cat["archivo"]), mmap_mode="r")
+            df.insert(info["columnas"].index(c), c, pd.Categorical.from_codes(codigos, cat["categorias"]))
+    return df
+
+
+def tomar_candado(carpeta: str):
+    # Candado de proceso: solo quien lo tiene lee MongoDB y exporta; el resto de los workers relee el snapshot.
+    # Se libera solo cuando el proceso termina, y entonces lo toma otro worker.
+    os.makedirs(carpeta, exist_ok=True)
+    archivo = open(_ruta(carpeta, ".refresco.lock"), "w")
+    try:
+        import fcntl
+    except ImportError:
+        # Windows: sin varios workers, el único proceso siempre refresca
+        return archivo
+    try:
+        fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        archivo.close()
+        return None
+    return archivo
+
+
+def version_snapshot(carpeta: str) -> Optional[str]:
+    try:
+        with open(_ruta(carpeta, MANIFIESTO), "r", encoding="utf-8") as f:
+            return json.load(f)["version"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def cargar_snapshot(carpeta: str) -> Optional[Tuple[pd.DataFrame, pd.DataFrame, str]]:
+    try:
+        with open(_ruta(carpeta, MANIFIESTO), "r", encoding="utf-8") as f:
+            manifiesto = json.load(f)
+        losequipos = _leer_tabla(carpeta, manifiesto["tablas"]["goles_por_equipo"])
+        goleadores = _leer_tabla(carpeta, manifiesto["tablas"]["goleadores_mundiales"])
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"No hay snapshot utilizable en {carpeta}: {e}")
+        return None
+    logger.info(f"Snapshot {manifiesto['version']} cargado desde {carpeta}")
+    return losequipos, goleadores, manifiesto["version"]
+
+
+def main():
+    from pymongo import MongoClient
+    from cargador import cargar_coleccion
+    from gestor_datos import version_de
+
+    parser = argparse.ArgumentParser(description="Exporta las colecciones de MongoDB a un snapshot local")
+    parser.add_argument("--uri", default=os.environ.get("MONGO_URI", "mongodb://localhost:27017/"))
+    parser.add_argument("--carpeta", default=os.environ.get("SNAPSHOT_DIR", "snapshot"))
+    parser.add_argument("--verificar", action="store_true",
+                        help="solo compara la versión del snapshot con la de MongoDB")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    db = MongoClient(args.uri, serverSelectionTimeoutMS=5000)["LasEstadisticasMundial"]
+    losequipos = cargar_coleccion(db, "goles_por_equipo")
+    goleadores = cargar_coleccion(db, "goleadores_mundiales")
+    version = version_de(losequipos, goleadores)
+    if args.verificar:
+        local = version_snapshot(args.carpeta)
+        estado = "al día" if local == version else "desactualizado"
+        print(f"snapshot {local} / MongoDB {version}: {estado}")
+        raise SystemExit(0 if local == version else 1)
+    exportar_snapshot(args.carpeta, losequipos, goleadores, version)
+
+
+if __name__ == "__main__":
+    main()
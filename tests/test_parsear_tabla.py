@@ -0,0 +1,61 @@
+import importlib.util
+import os
+import sys
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("selenium")
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+from limpieza import limpiar_goleadores
+
+# Páginas de Goleadores guardadas de ESPN: 2002 con el formato viejo (sin título, columna Goles)
+# y 2022 con el actual (tabla de Asistencias antes del título "Goleadores")
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _scraper():
+    # El nombre del archivo tiene un espacio: no se puede importar con import
+    spec = importlib.util.spec_from_file_location("los_scrappers", os.path.join(RAIZ, "Los Scrappers.py"))
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+scraper = _scraper()
+
+
+def _pagina(año):
+    with open(os.path.join(FIXTURES, f"goleadores_{año}.html"), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_formato_viejo():
+    df = scraper.parsear_tabla(_pagina(2002), 2002)
+    assert list(df.columns) == ["POS", "Nombre", "Equipo", "P", "Goles", "Año"]
+    # La fila del pie con colspan no tiene las mismas celdas y se descarta
+    assert len(df) == 5
+    assert df["POS"].tolist() == ["1", "2", "", "4", ""]
+    assert (df["Año"] == 2002).all()
+    assert list(scraper.normalizar_goles(df).columns) == ["POS", "Nombre", "Equipo", "P", "G", "Año"]
+
+
+def test_formato_actual_toma_la_tabla_de_goleadores():
+    df = scraper.parsear_tabla(_pagina(2022), 2022)
+    assert list(df.columns) == ["POS", "Nombre", "Equipo", "P", "G", "Año"]
+    assert len(df) == 7
+    assert "Harry Kane" not in df["Nombre"].tolist()
+    assert df["POS"].tolist() == ["1", "2", "3", "", "5", "", ""]
+
+
+@pytest.mark.parametrize("año, posiciones", [(2002, [1, 2, 2, 4, 4]), (2022, [1, 2, 3, 3, 5, 5, 5])])
+def test_pos_de_empates_se_rellenan(año, posiciones):
+    df = scraper.normalizar_goles(scraper.parsear_tabla(_pagina(año), año))
+    limpio, reporte = limpiar_goleadores(df)
+    assert limpio["POS"].tolist() == posiciones
+    assert reporte.pos_rellenadas == len(posiciones) - len(set(posiciones))
+    assert len(limpio) == len(df)
+
+
+def test_sin_tabla():
+    assert scraper.parsear_tabla("<html><body><p>Sin datos</p></body></html>", 2010).empty